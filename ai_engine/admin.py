@@ -1,3 +1,22 @@
 from django.contrib import admin
+from .models import EmbeddingCacheEntry, ExtractionCacheEntry, KeywordCacheEntry
 
-# Register your models here.
+
+@admin.register(EmbeddingCacheEntry)
+class EmbeddingCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ('model_name', 'text_hash', 'dim', 'created_at', 'last_used_at')
+    list_filter = ('model_name',)
+    exclude = ('vector',)
+
+
+@admin.register(KeywordCacheEntry)
+class KeywordCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ('pipeline_version', 'text_hash', 'created_at')
+    list_filter = ('pipeline_version',)
+
+
+@admin.register(ExtractionCacheEntry)
+class ExtractionCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ('file_hash', 'status', 'parser_version', 'pages', 'ocr', 'seconds', 'updated_at')
+    list_filter = ('status', 'parser_version', 'ocr')
+    exclude = ('text',)
@@ -0,0 +1,103 @@
+"""
+Persistent embedding cache.
+
+Embeddings are stored as float32 bytes in EmbeddingCacheEntry, keyed by the
+encoder key (model name plus backend, see screener.encoder_key) and the
+SHA-256 of the encoded text. Editing a resume's parsed_content or switching
+encoder models or backends therefore never returns a stale vector; rows of
+other encoder keys are dropped by the first write of each process. The
+least recently used rows beyond ATS_EMBEDDING_CACHE_MAX_ENTRIES are evicted,
+checked every ATS_EMBEDDING_CACHE_MAX_ENTRIES / 20 rows written rather than
+on every write. last_used_at is only refreshed when it is older than
+ATS_EMBEDDING_CACHE_TOUCH_SECONDS, so most lookups stay read-only instead of
+taking SQLite's write lock.
+"""
+import hashlib
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+# Encoder key whose other keys' rows this process already purged; rows written since the last cap check
+_purged_model_name = None
+_unchecked_writes = 0
+
+
+def text_hash(text):
+    return hashlib.sha256((text or "").encode('utf-8')).hexdigest()
+
+
+def cache_enabled():
+    return getattr(settings, 'ATS_EMBEDDING_CACHE', True)
+
+
+def get_cached_embeddings(model_name, hashes):
+    """Returns {text_hash: float32 vector} for the hashes already cached for model_name."""
+    from .models import EmbeddingCacheEntry
+
+    found = {}
+    hashes = list(set(hashes))
+    now = timezone.now()
+    touch_before = now - timedelta(seconds=getattr(settings, 'ATS_EMBEDDING_CACHE_TOUCH_SECONDS', 3600))
+    stale_ids = []
+    # Stay well below SQLite's bound-parameter limit
+    for start in range(0, len(hashes), 500):
+        chunk = hashes[start:start + 500]
+        rows = EmbeddingCacheEntry.objects.filter(model_name=model_name, text_hash__in=chunk)
+        for pk, h, vector, last_used_at in rows.values_list('pk', 'text_hash', 'vector', 'last_used_at'):
+            found[h] = np.frombuffer(bytes(vector), dtype=np.float32)
+            if last_used_at < touch_before:
+                stale_ids.append(pk)
+    # One write for the whole lookup, and none when every hit was used recently
+    if stale_ids:
+        with transaction.atomic():
+            for start in range(0, len(stale_ids), 500):
+                EmbeddingCacheEntry.objects.filter(pk__in=stale_ids[start:start + 500]).update(last_used_at=now)
+    return found
+
+
+def store_embeddings(model_name, hashes, vectors):
+    """Stores one float32 vector per text hash, then enforces the size cap."""
+    from .models import EmbeddingCacheEntry
+
+    entries = [
+        EmbeddingCacheEntry(
+            model_name=model_name,
+            text_hash=h,
+            dim=len(vector),
+            vector=np.asarray(vector, dtype=np.float32).tobytes(),
+        )
+        for h, vector in zip(hashes, vectors)
+    ]
+    with transaction.atomic():
+        EmbeddingCacheEntry.objects.bulk_create(entries, batch_size=500, ignore_conflicts=True)
+    prune(model_name, written=len(entries))
+
+
+def prune(current_model_name, written=0):
+    """
+    Drops entries of other encoder models (once per process and key), then the
+    least recently used ones beyond the cap once enough rows were written since
+    the last check.
+    """
+    global _purged_model_name, _unchecked_writes
+    from .models import EmbeddingCacheEntry
+
+    max_entries = getattr(settings, 'ATS_EMBEDDING_CACHE_MAX_ENTRIES', 50000)
+    if _purged_model_name != current_model_name:
+        EmbeddingCacheEntry.objects.exclude(model_name=current_model_name).delete()
+        _purged_model_name = current_model_name
+        _unchecked_writes = max_entries
+    _unchecked_writes += written
+    if _unchecked_writes < max(1, max_entries // 20):
+        return
+    _unchecked_writes = 0
+    excess = EmbeddingCacheEntry.objects.count() - max_entries
+    if excess > 0:
+        stale_ids = list(
+            EmbeddingCacheEntry.objects.order_by('last_used_at', 'pk').values_list('pk', flat=True)[:excess]
+        )
+        for start in range(0, len(stale_ids), 500):
+            EmbeddingCacheEntry.objects.filter(pk__in=stale_ids[start:start + 500]).delete()
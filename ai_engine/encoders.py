@@ -0,0 +1,68 @@
+"""
+Sentence-encoder backends for CPU inference, selected by settings.ATS_ENCODER_BACKEND:
+
+- 'torch':      full-precision PyTorch SentenceTransformer (the reference)
+- 'torch-int8': the same model with its Linear layers dynamically quantized to int8
+- 'onnx':       ONNX Runtime through sentence-transformers' onnx backend; point
+                ATS_ENCODER_ONNX_FILE at a quantized export (e.g.
+                'onnx/model_qint8_avx2.onnx') for int8 inference
+
+All backends expose SentenceTransformer.encode(). `threads` caps the intra-op
+thread pool so several workers on one host don't oversubscribe the cores.
+Run `python manage.py check_encoder_parity` before switching backends.
+"""
+import numpy as np
+
+BACKENDS = ('torch', 'torch-int8', 'onnx')
+
+
+def load_encoder(model_name, backend='torch', threads=0, onnx_file=''):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown encoder backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+    from sentence_transformers import SentenceTransformer
+    import torch
+
+    if threads:
+        torch.set_num_threads(threads)
+
+    if backend == 'onnx':
+        model_kwargs = {'provider': 'CPUExecutionProvider'}
+        if onnx_file:
+            model_kwargs['file_name'] = onnx_file
+        if threads:
+            import onnxruntime
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+            model_kwargs['session_options'] = options
+        return SentenceTransformer(model_name, device='cpu', backend='onnx', model_kwargs=model_kwargs)
+
+    model = SentenceTransformer(model_name, device='cpu')
+    if backend == 'torch-int8':
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return model
+
+
+def similarity_matrix(model, queries, documents, batch_size=32):
+    """(documents x queries) cosine similarities on the 0-100 scale used for scores."""
+    kwargs = dict(batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False)
+    q = np.asarray(model.encode(queries, **kwargs), dtype=np.float32)
+    d = np.asarray(model.encode(documents, **kwargs), dtype=np.float32)
+    return (d @ q.T) * 100
+
+
+def parity_report(reference, candidate, queries, documents):
+    """
+    Compares two encoders on the same query x document pairs. Differences are
+    in score points (0-100); top1_agreement is the share of queries whose best
+    document is the same under both encoders.
+    """
+    expected = similarity_matrix(reference, queries, documents)
+    actual = similarity_matrix(candidate, queries, documents)
+    diff = np.abs(expected - actual)
+    return {
+        'pairs': int(diff.size),
+        'max_diff': float(diff.max()) if diff.size else 0.0,
+        'mean_diff': float(diff.mean()) if diff.size else 0.0,
+        'top1_agreement': float(np.mean(expected.argmax(axis=0) == actual.argmax(axis=0))) if diff.size else 1.0,
+    }
@@ -0,0 +1,165 @@
+"""
+Durable record of text extraction per resume file.
+
+Every extraction outcome (the text, or that the file came out empty, failed
+or timed out) is stored in ExtractionCacheEntry, keyed by the SHA-256 of the
+file, together with the parser version that produced it, the time it took,
+the pages read and whether OCR was used. A file already extracted by the
+current parser version is answered from the table, so unreadable files are
+not re-parsed on every scan. Bumping parser.EXTRACTION_RULES_VERSION (or
+upgrading pdfminer) makes entries stale; `python manage.py reextract_stale`
+redoes them in bulk. Fresh extractions are logged as JSON (DEBUG) on the
+'ai_engine.extraction_cache' logger.
+"""
+import hashlib
+import json
+import logging
+import time
+from functools import lru_cache
+from importlib import metadata
+
+from django.conf import settings
+
+from .parser import EXTRACTION_RULES_VERSION, ExtractionResult, extract_document, extract_many
+
+# Failures that say nothing about the file itself; never cached
+_TRANSIENT_ERRORS = ('extraction worker crashed',)
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def parser_version():
+    try:
+        pdfminer_version = metadata.version('pdfminer.six')
+    except metadata.PackageNotFoundError:
+        pdfminer_version = 'unknown'
+    return f"parser-{EXTRACTION_RULES_VERSION}/pdfminer-{pdfminer_version}"
+
+
+def cache_enabled():
+    return getattr(settings, 'ATS_EXTRACTION_CACHE', True)
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def result_status(result):
+    if result.error == 'timeout':
+        return 'TIMEOUT'
+    if result.error:
+        return 'FAILED'
+    return 'OK' if (result.text or "").strip() else 'EMPTY'
+
+
+def _result_from_entry(file_path, entry):
+    """The cached outcome; seconds is 0 since answering from the cache costs no extraction time."""
+    error = None
+    if entry.status == 'TIMEOUT':
+        error = 'timeout'
+    elif entry.status == 'FAILED':
+        error = entry.error or 'extraction failed'
+    return ExtractionResult(file_path, entry.text, error, 0.0, entry.ocr, entry.pages)
+
+
+def lookup(hashes, retry_failed=False):
+    """{file_hash: ExtractionCacheEntry} of the current parser version (successes only if retry_failed)."""
+    from .models import ExtractionCacheEntry
+
+    hashes = [h for h in set(hashes) if h]
+    if not hashes or not cache_enabled():
+        return {}
+    entries = ExtractionCacheEntry.objects.filter(parser_version=parser_version())
+    if retry_failed:
+        entries = entries.filter(status__in=['OK', 'EMPTY'])
+    found = {}
+    for start in range(0, len(hashes), 500):
+        found.update((e.file_hash, e) for e in entries.filter(file_hash__in=hashes[start:start + 500]))
+    return found
+
+
+def record(results):
+    """Stores [(file_hash, ExtractionResult)] under the current parser version, replacing older entries."""
+    from .models import ExtractionCacheEntry
+
+    if logger.isEnabledFor(logging.DEBUG):
+        for h, result in results:
+            logger.debug(json.dumps({
+                'event': 'extraction', 'file_hash': h, 'status': result_status(result),
+                'seconds': round(result.seconds or 0.0, 6), 'pages': result.pages, 'ocr': bool(result.ocr),
+            }))
+    if not cache_enabled():
+        return
+    version = parser_version()
+    entries = {}
+    for h, result in results:
+        if not h or result.error in _TRANSIENT_ERRORS:
+            continue
+        status = result_status(result)
+        entries[h] = ExtractionCacheEntry(
+            file_hash=h,
+            parser_version=version,
+            status=status,
+            text=result.text if status == 'OK' else "",
+            error=result.error if status == 'FAILED' else "",
+            seconds=result.seconds or 0.0,
+            pages=result.pages,
+            ocr=bool(result.ocr),
+        )
+    if entries:
+        ExtractionCacheEntry.objects.bulk_create(
+            list(entries.values()),
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['file_hash'],
+            update_fields=['parser_version', 'status', 'text', 'error', 'seconds', 'pages', 'ocr', 'updated_at'],
+        )
+
+
+def extract_many_cached(files, workers=None, timeout=None, retry_failed=False):
+    """
+    files: {file_path: file_hash}. Yields ExtractionResult like parser.extract_many:
+    files the current parser version has already seen come from the cache (known
+    failures included, unless retry_failed); the rest are extracted and recorded.
+    """
+    known = lookup(files.values(), retry_failed=retry_failed)
+    to_extract = {}
+    for file_path, h in files.items():
+        entry = known.get(h)
+        if entry is not None:
+            yield _result_from_entry(file_path, entry)
+        else:
+            to_extract[file_path] = h
+
+    fresh = []
+    try:
+        for result in extract_many(to_extract, workers=workers, timeout=timeout):
+            fresh.append((to_extract[result.file_path], result))
+            yield result
+            if len(fresh) >= 100:
+                record(fresh)
+                fresh = []
+    finally:
+        record(fresh)
+
+
+def extract_cached(file_path, h):
+    """Single-file extraction in the calling process, through the cache."""
+    entry = lookup([h]).get(h)
+    if entry is not None:
+        return _result_from_entry(file_path, entry)
+    started = time.perf_counter()
+    try:
+        document = extract_document(file_path)
+        result = ExtractionResult(
+            file_path, document.text, None, time.perf_counter() - started, document.ocr, document.pages,
+        )
+    except Exception as e:
+        result = ExtractionResult(file_path, "", str(e), time.perf_counter() - started)
+    record([(h, result)])
+    return result
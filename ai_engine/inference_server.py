@@ -0,0 +1,196 @@
+"""
+Local inference daemon shared by all web workers.
+
+One process (`python manage.py run_inference_server`) owns the sentence
+encoder and spaCy; web workers talk to it over a Unix socket instead of each
+holding their own copy of the models. Concurrent embed requests are coalesced
+into a single forward pass: the batcher takes the first queued request, waits
+up to `max_wait` seconds for more (up to `max_batch` texts), encodes them all
+at once and hands each caller its rows.
+
+Messages use multiprocessing.connection (pickled tuples, authenticated with a
+shared key):
+
+    ('info', None)        -> {'model_name', 'fallback', 'encoder_key'}
+    ('embed', [texts])    -> float32 array, one normalised row per text
+    ('keywords', [texts]) -> [keyword list per text]
+
+Replies are ('ok', value) or ('error', message).
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Listener
+
+
+class InferenceUnavailable(Exception):
+    """The daemon could not be reached; callers fall back to in-process models."""
+
+
+class InferenceClient:
+    """Thread-safe client: one persistent connection per thread (and per process after fork)."""
+
+    def __init__(self, address, authkey):
+        self.address = address
+        self.authkey = authkey
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid != os.getpid():
+            # Inherited from the parent across fork: never share the socket
+            conn = None
+        if conn is None:
+            conn = Client(self.address, family='AF_UNIX', authkey=self.authkey)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _drop_connection(self):
+        conn = getattr(self._local, 'conn', None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    def call(self, op, arg=None):
+        # One retry on a fresh connection covers a daemon restart between calls
+        for attempt in (1, 2):
+            try:
+                conn = self._connection()
+                conn.send((op, arg))
+                status, value = conn.recv()
+                break
+            except (OSError, EOFError) as e:
+                self._drop_connection()
+                if attempt == 2:
+                    raise InferenceUnavailable(str(e)) from e
+        if status != 'ok':
+            raise RuntimeError(f"Inference server error: {value}")
+        return value
+
+    def info(self):
+        return self.call('info')
+
+    def embed(self, texts):
+        return self.call('embed', list(texts))
+
+    def keywords(self, texts):
+        return self.call('keywords', list(texts))
+
+
+class RemoteEncoder:
+    """Stands in for SentenceTransformer in a web worker; encode() runs in the daemon."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def encode(self, texts, **kwargs):
+        return self.client.embed(texts)
+
+
+class InferenceServer:
+    def __init__(self, address, authkey, max_batch=64, max_wait=0.005):
+        self.address = address
+        self.authkey = authkey
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._nlp_lock = threading.Lock()
+        self.batches = 0
+        self.texts = 0
+
+    def serve_forever(self):
+        from . import screener
+
+        screener.use_local_models()
+        screener.warm_up()
+        self._info = {
+            'model_name': screener.EMBEDDING_MODEL_NAME,
+            'encoder_key': screener.encoder_key(),
+            'fallback': screener.is_fallback(),
+        }
+        threading.Thread(target=self._batch_loop, name='inference-batcher', daemon=True).start()
+
+        if os.path.exists(self.address):
+            # Left behind by a previous run; binding would fail otherwise
+            os.remove(self.address)
+        with Listener(self.address, family='AF_UNIX', authkey=self.authkey) as listener:
+            print(f"Inference server listening on {self.address} (fallback={self._info['fallback']})")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    # Failed handshake (wrong key, client gone): keep serving
+                    print(f"Inference server: rejected connection ({e})")
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+    def _serve_connection(self, conn):
+        from . import screener
+
+        with conn:
+            while True:
+                try:
+                    op, arg = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    if op == 'info':
+                        value = self._info
+                    elif op == 'embed':
+                        value = self.submit(arg).result()
+                    elif op == 'keywords':
+                        with self._nlp_lock:
+                            # Callers consult the keyword cache before asking
+                            value = screener.extract_keywords_many(arg, use_cache=False)
+                    else:
+                        raise ValueError(f"unknown operation {op!r}")
+                    reply = ('ok', value)
+                except Exception as e:
+                    reply = ('error', f"{type(e).__name__}: {e}")
+                try:
+                    conn.send(reply)
+                except (EOFError, OSError):
+                    return
+
+    def submit(self, texts):
+        future = Future()
+        self._queue.put((list(texts), future))
+        return future
+
+    def _batch_loop(self):
+        from . import screener
+
+        while True:
+            pending = [self._queue.get()]
+            count = len(pending[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while count < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                pending.append(item)
+                count += len(item[0])
+
+            texts = [text for batch, _ in pending for text in batch]
+            try:
+                vectors = screener.encode_texts(texts, use_cache=False) if texts else None
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.texts += len(texts)
+            start = 0
+            for batch, future in pending:
+                future.set_result(vectors[start:start + len(batch)] if vectors is not None else [])
+                start += len(batch)
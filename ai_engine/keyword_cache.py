@@ -0,0 +1,112 @@
+"""
+Memoised keyword extraction results.
+
+Keyword lists are keyed by the keyword pipeline version (spaCy release, model
+package version, extraction rules) and the SHA-256 of the text. A bounded
+in-process LRU answers repeated JDs without any I/O; KeywordCacheEntry rows
+make results survive restarts and are shared between workers. Upgrading spaCy
+or the model changes the version, so stale lists are never returned; rows of
+older versions are dropped by the first write of each process. The size cap
+is enforced every ATS_KEYWORD_CACHE_MAX_ENTRIES / 20 rows written, not on
+every write.
+"""
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from importlib import metadata
+
+from django.conf import settings
+from django.db import transaction
+
+from .embedding_cache import text_hash
+
+# Bump when the token filtering in screener._keywords_from_doc changes
+KEYWORD_RULES_VERSION = 1
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+# Pipeline version whose older rows this process already purged; rows written since the last cap check
+_purged_version = None
+_unchecked_writes = 0
+
+
+@lru_cache(maxsize=1)
+def keyword_pipeline_version():
+    """Identifies the installed keyword pipeline without loading it."""
+    import spacy
+    try:
+        model_version = metadata.version('en_core_web_sm')
+    except metadata.PackageNotFoundError:
+        model_version = 'blank'
+    return f"spacy-{spacy.__version__}/en_core_web_sm-{model_version}/rules-{KEYWORD_RULES_VERSION}"
+
+
+def persistent_enabled():
+    return getattr(settings, 'ATS_KEYWORD_CACHE_PERSISTENT', True)
+
+
+def get_cached_keywords(hashes):
+    """Returns {text_hash: keyword list} from the in-process LRU, then the database."""
+    version = keyword_pipeline_version()
+    found = {}
+    with _memo_lock:
+        for h in hashes:
+            keywords = _memo.get((version, h))
+            if keywords is not None:
+                _memo.move_to_end((version, h))
+                found[h] = keywords
+
+    missing = list({h for h in hashes if h not in found})
+    if missing and persistent_enabled():
+        from .models import KeywordCacheEntry
+
+        stored = {}
+        for start in range(0, len(missing), 500):
+            rows = KeywordCacheEntry.objects.filter(
+                pipeline_version=version, text_hash__in=missing[start:start + 500],
+            ).values_list('text_hash', 'keywords')
+            stored.update(rows)
+        _remember(version, stored)
+        found.update(stored)
+    return {h: list(keywords) for h, keywords in found.items()}
+
+
+def store_keywords(hashes, keyword_lists):
+    global _purged_version, _unchecked_writes
+    version = keyword_pipeline_version()
+    entries = dict(zip(hashes, keyword_lists))
+    _remember(version, entries)
+    if not persistent_enabled():
+        return
+    from .models import KeywordCacheEntry
+
+    with transaction.atomic():
+        KeywordCacheEntry.objects.bulk_create(
+            [KeywordCacheEntry(pipeline_version=version, text_hash=h, keywords=k) for h, k in entries.items()],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+    max_entries = getattr(settings, 'ATS_KEYWORD_CACHE_MAX_ENTRIES', 20000)
+    if _purged_version != version:
+        KeywordCacheEntry.objects.exclude(pipeline_version=version).delete()
+        _purged_version = version
+        _unchecked_writes = max_entries
+    _unchecked_writes += len(entries)
+    if _unchecked_writes < max(1, max_entries // 20):
+        return
+    _unchecked_writes = 0
+    excess = KeywordCacheEntry.objects.count() - max_entries
+    if excess > 0:
+        oldest = list(KeywordCacheEntry.objects.order_by('created_at', 'pk').values_list('pk', flat=True)[:excess])
+        for start in range(0, len(oldest), 500):
+            KeywordCacheEntry.objects.filter(pk__in=oldest[start:start + 500]).delete()
+
+
+def _remember(version, entries):
+    max_size = getattr(settings, 'ATS_KEYWORD_CACHE_SIZE', 1024)
+    with _memo_lock:
+        for h, keywords in entries.items():
+            _memo[(version, h)] = tuple(keywords)
+            _memo.move_to_end((version, h))
+        while len(_memo) > max_size:
+            _memo.popitem(last=False)
@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ai_engine.encoders import BACKENDS, load_encoder, parity_report
+from ai_engine.screener import EMBEDDING_MODEL_NAME
+from jobs.models import JobRequirement
+from resumes.models import Resume, ScanRun
+
+SAMPLE_QUERIES = [
+    "Backend engineer with 5 years of Python, Django and PostgreSQL experience.",
+    "Registered nurse with ICU experience and a current BLS certification.",
+    "Financial analyst skilled in Excel, SQL and financial modelling.",
+]
+SAMPLE_DOCUMENTS = [
+    "Senior software developer. Built REST APIs in Python and Django, PostgreSQL, Docker, AWS.",
+    "ICU nurse with 6 years of critical care experience. BLS and ACLS certified.",
+    "Analyst: budgeting, forecasting, Excel models, SQL reporting, CFA level II.",
+    "Chef with 2 years of experience in busy kitchens. Culinary school graduate.",
+]
+
+
+class Command(BaseCommand):
+    help = "Compare an encoder backend's scores with the reference full-precision model."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backend', default=settings.ATS_ENCODER_BACKEND, choices=BACKENDS)
+        parser.add_argument('--tolerance', type=float, default=2.0, help="Largest allowed score difference (0-100 points).")
+        parser.add_argument('--sample', type=int, default=50, help="Stored resumes / job descriptions to compare on.")
+
+    def handle(self, *args, **options):
+        sample = options['sample']
+        queries = list(JobRequirement.objects.values_list('description', flat=True)[:sample])
+        queries += list(ScanRun.objects.values_list('jd_text', flat=True)[:sample])
+        documents = list(Resume.objects.exclude(parsed_content='').values_list('parsed_content', flat=True)[:sample])
+        if not queries or not documents:
+            self.stdout.write("Not enough stored data; using built-in samples.")
+            queries, documents = SAMPLE_QUERIES, SAMPLE_DOCUMENTS
+
+        threads = settings.ATS_ENCODER_THREADS
+        reference = load_encoder(EMBEDDING_MODEL_NAME, 'torch', threads=threads)
+        candidate = load_encoder(
+            EMBEDDING_MODEL_NAME, options['backend'], threads=threads, onnx_file=settings.ATS_ENCODER_ONNX_FILE,
+        )
+        report = parity_report(reference, candidate, queries, documents)
+        self.stdout.write(
+            f"{options['backend']}: {report['pairs']} pairs, max diff {report['max_diff']:.3f}, "
+            f"mean diff {report['mean_diff']:.3f}, top-1 agreement {report['top1_agreement']:.0%}"
+        )
+        if report['max_diff'] > options['tolerance']:
+            raise CommandError(f"Scores differ by more than {options['tolerance']} points from the reference model.")
+        self.stdout.write(self.style.SUCCESS("Within tolerance."))
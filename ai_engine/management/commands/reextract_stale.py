@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ai_engine.extraction_cache import extract_many_cached, parser_version
+from ai_engine.models import ExtractionCacheEntry
+from resumes.models import Resume
+
+
+class Command(BaseCommand):
+    help = "Re-extract resume files whose cached extraction came from an older parser version."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--failed', action='store_true', help="Also retry files the current parser failed on.")
+        parser.add_argument('--workers', type=int, default=settings.ATS_EXTRACTION_WORKERS or None)
+        parser.add_argument('--timeout', type=float, default=settings.ATS_EXTRACTION_TIMEOUT)
+        parser.add_argument('--dry-run', action='store_true', help="Only report how many entries are stale.")
+
+    def handle(self, *args, **options):
+        version = parser_version()
+        stale = ExtractionCacheEntry.objects.exclude(parser_version=version)
+        if options['failed']:
+            stale = stale | ExtractionCacheEntry.objects.filter(
+                parser_version=version, status__in=['FAILED', 'TIMEOUT'],
+            )
+        hashes = list(stale.values_list('file_hash', flat=True))
+        self.stdout.write(f"{len(hashes)} stale extraction(s); current parser is {version}.")
+        if not hashes or options['dry_run']:
+            return
+
+        # One stored file per hash; every resume sharing the hash gets the new text
+        paths = {}
+        resume_ids = {}
+        for start in range(0, len(hashes), 500):
+            rows = Resume.objects.filter(content_hash__in=hashes[start:start + 500]).exclude(file='')
+            for resume in rows.only('pk', 'file', 'content_hash').order_by('pk'):
+                resume_ids.setdefault(resume.content_hash, []).append(resume.pk)
+                paths.setdefault(resume.content_hash, resume.file.path)
+        files = {path: h for h, path in paths.items()}
+
+        orphaned = set(hashes) - set(paths)
+        for start in range(0, len(hashes), 500):
+            chunk = [h for h in hashes[start:start + 500] if h in orphaned]
+            ExtractionCacheEntry.objects.filter(file_hash__in=chunk).delete()
+
+        counts = {'OK': 0, 'EMPTY': 0, 'FAILED': 0}
+        changed = []
+        results = extract_many_cached(
+            files, workers=options['workers'], timeout=options['timeout'], retry_failed=options['failed'],
+        )
+        for result in results:
+            if result.error:
+                counts['FAILED'] += 1
+                continue
+            if not result.text:
+                # Keep whatever text an older parser managed to get
+                counts['EMPTY'] += 1
+                continue
+            counts['OK'] += 1
+            ids = resume_ids[files[result.file_path]]
+            with transaction.atomic():
+                Resume.objects.filter(pk__in=ids).update(parsed_content=result.text, parsed_with_ocr=result.ocr)
+            changed.extend(ids)
+
+        if changed:
+            # Dropped from the stored-resume search index; the next sync re-encodes them
+            from resumes.search import forget_resumes
+
+            forget_resumes(changed)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Re-extracted {len(files)} file(s): {counts['OK']} with text, {counts['EMPTY']} empty, "
+            f"{counts['FAILED']} failed; {len(changed)} resume(s) updated, {len(orphaned)} orphaned entries removed."
+        ))
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ai_engine.inference_server import InferenceServer
+
+
+class Command(BaseCommand):
+    help = "Serve embeddings and keyword extraction to the web workers over a Unix socket (ATS_INFERENCE_SOCKET)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--socket', default=settings.ATS_INFERENCE_SOCKET, help="Socket path (default: ATS_INFERENCE_SOCKET).")
+        parser.add_argument('--max-batch', type=int, default=settings.ATS_INFERENCE_MAX_BATCH, help="Most texts coalesced into one forward pass.")
+        parser.add_argument('--max-wait-ms', type=float, default=settings.ATS_INFERENCE_MAX_WAIT_MS, help="How long a request waits for others to join its batch.")
+
+    def handle(self, *args, **options):
+        if not options['socket']:
+            raise CommandError("Set ATS_INFERENCE_SOCKET or pass --socket.")
+        server = InferenceServer(
+            options['socket'],
+            authkey=settings.SECRET_KEY.encode(),
+            max_batch=options['max_batch'],
+            max_wait=options['max_wait_ms'] / 1000.0,
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            self.stdout.write(f"Stopped after {server.batches} batch(es), {server.texts} text(s).")
@@ -0,0 +1,98 @@
+"""
+Single-pass multi-keyword matching.
+
+KeywordMatcher compiles every keyword of every category into one trie-shaped
+regex (so the engine walks shared prefixes once instead of trying each
+keyword) and scans the lowercased text once, returning the hits of all
+categories together. Keywords must start at a word boundary; how a keyword
+may end is set per category:
+
+- 'word':      whole word only ("java" does not match "javascript")
+- 'inflected': whole word or a common English inflection ("manage" matches "managed")
+- 'prefix':    any continuation ("experience" matches "experienced")
+
+In 'word' and 'inflected' mode a keyword followed by '+' or '#' is part of a
+longer name: "C" does not match in "C++" or "C#".
+"""
+import re
+from functools import lru_cache
+
+INFLECTION_SUFFIXES = frozenset(['', 's', 'es', 'd', 'ed', 'ing', 'er', 'ers', 'ment', 'ments'])
+
+_WORD_RUN = re.compile(r'\w*')
+# Characters that continue a skill name past a word end (C -> C++, C#)
+NAME_CONTINUATIONS = ('+', '#')
+
+
+def _trie_regex(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node):
+        is_end = '' in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch != '']
+        if not branches:
+            return ''
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        group = '(?:' + '|'.join(branches) + ')'
+        # Greedy '?': the longest keyword at a position wins, shorter ones are recovered via _prefixes
+        return group + '?' if is_end else group
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    def __init__(self, keyword_sets, modes=None):
+        """
+        keyword_sets: {category: iterable of keywords}
+        modes: {category: 'word' | 'inflected' | 'prefix'}; categories default to 'word'.
+        """
+        modes = modes or {}
+        self.categories = list(keyword_sets)
+        # lowercased keyword -> [(category, original keyword, mode)]
+        self._entries = {}
+        for category, keywords in keyword_sets.items():
+            mode = modes.get(category, 'word')
+            for keyword in keywords:
+                key = (keyword or "").strip().lower()
+                if key:
+                    self._entries.setdefault(key, []).append((category, keyword, mode))
+
+        # Shorter keywords that are string prefixes of a longer one ("work" of "work permit")
+        keys = sorted(self._entries, key=len)
+        self._prefixes = {key: [k for k in keys if len(k) < len(key) and key.startswith(k)] for key in keys}
+
+        self._pattern = None
+        if self._entries:
+            self._pattern = re.compile(r'(?<!\w)(?=(' + _trie_regex(self._entries) + '))')
+
+    def match(self, text):
+        """Returns {category: set of matched keywords (original spelling)} in one pass over text."""
+        hits = {category: set() for category in self.categories}
+        if not text or self._pattern is None:
+            return hits
+        text = text.lower()
+        for m in self._pattern.finditer(text):
+            start = m.start()
+            longest = m.group(1)
+            for key in [longest] + self._prefixes[longest]:
+                suffix = _WORD_RUN.match(text, start + len(key)).group()
+                continued = text.startswith(NAME_CONTINUATIONS, start + len(key) + len(suffix))
+                for category, keyword, mode in self._entries[key]:
+                    if mode == 'prefix' or (
+                        not continued
+                        and (not suffix or (mode == 'inflected' and suffix in INFLECTION_SUFFIXES))
+                    ):
+                        hits[category].add(keyword)
+        return hits
+
+
+@lru_cache(maxsize=64)
+def keyword_matcher(keywords, mode='word'):
+    """Cached single-category matcher for a tuple of keywords (category name 'keywords')."""
+    return KeywordMatcher({'keywords': keywords}, modes={'keywords': mode})
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmbeddingCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(max_length=255)),
+                ('text_hash', models.CharField(help_text='SHA-256 of the encoded text', max_length=64)),
+                ('dim', models.PositiveIntegerField()),
+                ('vector', models.BinaryField(help_text='float32 embedding bytes')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'unique_together': {('model_name', 'text_hash')},
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KeywordCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pipeline_version', models.CharField(max_length=255)),
+                ('text_hash', models.CharField(help_text='SHA-256 of the text', max_length=64)),
+                ('keywords', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'unique_together': {('pipeline_version', 'text_hash')},
+            },
+        ),
+    ]
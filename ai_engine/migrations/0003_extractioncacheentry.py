@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0002_keywordcacheentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExtractionCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_hash', models.CharField(help_text='SHA-256 of the file', max_length=64, unique=True)),
+                ('parser_version', models.CharField(db_index=True, max_length=255)),
+                ('status', models.CharField(choices=[('OK', 'Text extracted'), ('EMPTY', 'No text found'), ('FAILED', 'Extraction failed'), ('TIMEOUT', 'Extraction timed out')], max_length=10)),
+                ('text', models.TextField(blank=True)),
+                ('error', models.TextField(blank=True)),
+                ('seconds', models.FloatField(default=0.0, help_text='Extraction time')),
+                ('pages', models.PositiveIntegerField(blank=True, help_text='Pages read (paged documents only)', null=True)),
+                ('ocr', models.BooleanField(default=False, help_text='Text was recovered by OCR')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -1,3 +1,54 @@
 from django.db import models
 
-# Create your models here.
+
+class EmbeddingCacheEntry(models.Model):
+    """Sentence-encoder embedding of one text, keyed by encoder model + SHA-256 of the text."""
+    model_name = models.CharField(max_length=255)
+    text_hash = models.CharField(max_length=64, help_text="SHA-256 of the encoded text")
+    dim = models.PositiveIntegerField()
+    vector = models.BinaryField(help_text="float32 embedding bytes")
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        unique_together = ('model_name', 'text_hash')
+
+    def __str__(self):
+        return f"{self.model_name} {self.text_hash[:12]}"
+
+
+class KeywordCacheEntry(models.Model):
+    """extract_keywords() result for one text, keyed by keyword pipeline version + SHA-256 of the text."""
+    pipeline_version = models.CharField(max_length=255)
+    text_hash = models.CharField(max_length=64, help_text="SHA-256 of the text")
+    keywords = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        unique_together = ('pipeline_version', 'text_hash')
+
+    def __str__(self):
+        return f"{self.pipeline_version} {self.text_hash[:12]}"
+
+
+class ExtractionCacheEntry(models.Model):
+    """Outcome of extracting text from one resume file, keyed by SHA-256 of the file."""
+    STATUS_CHOICES = [
+        ('OK', 'Text extracted'),
+        ('EMPTY', 'No text found'),
+        ('FAILED', 'Extraction failed'),
+        ('TIMEOUT', 'Extraction timed out'),
+    ]
+
+    file_hash = models.CharField(max_length=64, unique=True, help_text="SHA-256 of the file")
+    parser_version = models.CharField(max_length=255, db_index=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    text = models.TextField(blank=True)
+    error = models.TextField(blank=True)
+    seconds = models.FloatField(default=0.0, help_text="Extraction time")
+    pages = models.PositiveIntegerField(null=True, blank=True, help_text="Pages read (paged documents only)")
+    ocr = models.BooleanField(default=False, help_text="Text was recovered by OCR")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.file_hash[:12]} {self.status} ({self.parser_version})"
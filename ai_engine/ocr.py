@@ -0,0 +1,300 @@
+"""
+OCR for photographed resumes and scanned PDF pages.
+
+Tesseract's configuration (binary, tessdata directory, language, page
+segmentation mode) is resolved once per process, see ocr_config().
+Recognition runs on a long-lived OcrPool of ATS_OCR_WORKERS threads:
+
+- with the optional `tesserocr` bindings installed, every pool thread keeps
+  its own TessBaseAPI with the language model loaded, so an image costs only
+  recognition. This is the only engine with persistent OCR workers;
+- otherwise (the default 'cli' engine) each thread starts the tesseract
+  binary once per batch: one process reads a list of images, so process
+  start-up and model loading are paid once per batch instead of once per
+  image. Those processes do not outlive their batch.
+
+Inside extract_many's worker processes the pool is capped at the process's
+share of the cores (limit_workers), so N extraction processes never start
+N x cpu_count tesseracts, and extract_many's image batches are recognized
+in a single tesseract call each (recognize(..., single_call=True)): the
+batch is already the unit of parallel work.
+
+A recognize() call with a timeout that runs out, or that is interrupted by
+the extraction alarm (parser.ExtractionTimeout), kills the tesseract
+processes it started and raises ExtractionTimeout. Queued images are
+dropped; an image already inside tesserocr finishes in the background.
+
+Images are prepared before recognition: EXIF rotation applied, converted to
+grayscale, downscaled so the long side is at most ATS_OCR_MAX_SIDE pixels
+(phone photos are often 4000px+, far more than Tesseract needs) and
+optionally binarized (ATS_OCR_BINARIZE).
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+
+from .parser import ExtractionTimeout, _setting
+
+# Tesseract language data shipped with the repo (tessdata/eng.traineddata)
+BUNDLED_TESSDATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tessdata')
+
+# Common Windows install locations, for hosts where tesseract is not on PATH
+WINDOWS_TESSERACT_PATHS = [
+    r'C:\Program Files\Tesseract-OCR\tesseract.exe',
+    r'C:\Program Files (x86)\Tesseract-OCR\tesseract.exe',
+    r'D:\jalak\Resume ATS Checker\ATS-Resume-Repo\tesseract.exe',
+]
+WINDOWS_TESSDATA_PATHS = [
+    r'D:\jalak\Resume ATS Checker\ATS-Resume-Repo\tessdata',
+    r'C:\Program Files\Tesseract-OCR\tessdata',
+    r'C:\Program Files (x86)\Tesseract-OCR\tessdata',
+]
+
+# cmd: tesseract binary; tessdata_dir: '' leaves the choice to tesseract; psm: page segmentation mode
+OcrConfig = namedtuple('OcrConfig', ['cmd', 'tessdata_dir', 'lang', 'psm', 'max_side', 'binarize', 'workers', 'engine'])
+
+_config = None
+_pool = None
+_lock = threading.Lock()
+# Cap on OCR threads in this process, set by extraction pool workers (see limit_workers)
+_worker_limit = None
+
+
+class OcrUnavailable(Exception):
+    """No OCR engine could be started (tesseract missing or misconfigured)."""
+
+
+def _resolve_config():
+    cmd = (
+        _setting('ATS_TESSERACT_CMD', '')
+        or shutil.which('tesseract')
+        or next((path for path in WINDOWS_TESSERACT_PATHS if os.path.exists(path)), 'tesseract')
+    )
+    lang = _setting('ATS_OCR_LANG', 'eng')
+    candidates = [_setting('ATS_TESSDATA_DIR', ''), BUNDLED_TESSDATA, os.environ.get('TESSDATA_PREFIX', '')]
+    tessdata_dir = next(
+        (path for path in candidates + WINDOWS_TESSDATA_PATHS
+         if path and os.path.exists(os.path.join(path, f'{lang}.traineddata'))),
+        '',
+    )
+    try:
+        import tesserocr  # noqa: F401
+        engine = 'tesserocr'
+    except ImportError:
+        engine = 'cli'
+    return OcrConfig(
+        cmd=cmd,
+        tessdata_dir=tessdata_dir,
+        lang=lang,
+        psm=_setting('ATS_OCR_PSM', 3),
+        max_side=_setting('ATS_OCR_MAX_SIDE', 3000),
+        binarize=_setting('ATS_OCR_BINARIZE', False),
+        workers=_setting('ATS_OCR_WORKERS', 0) or os.cpu_count() or 1,
+        engine=engine,
+    )
+
+
+def ocr_config():
+    """The process-wide OCR configuration, resolved on first use."""
+    global _config
+    if _config is None:
+        with _lock:
+            if _config is None:
+                _config = _resolve_config()
+                print(
+                    f"OCR: {_config.engine} engine, tesseract={_config.cmd}, "
+                    f"tessdata={_config.tessdata_dir or '(default)'}, psm={_config.psm}, workers={_config.workers}"
+                )
+    return _config
+
+
+def _binarize(image):
+    """Otsu threshold of a grayscale image: black text on white, 1-bit."""
+    import numpy as np
+
+    histogram = np.asarray(image.histogram(), dtype=np.float64)
+    levels = np.arange(256)
+    weight_bg = np.cumsum(histogram)
+    weight_fg = weight_bg[-1] - weight_bg
+    cum_mean = np.cumsum(histogram * levels)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_bg = cum_mean / weight_bg
+        mean_fg = (cum_mean[-1] - cum_mean) / weight_fg
+        between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    threshold = int(np.argmax(np.nan_to_num(between)))
+    return image.point(lambda p: 255 if p > threshold else 0, mode='1')
+
+
+def prepare_image(image, max_side=None, binarize=None):
+    """Upright, grayscale, at most max_side pixels on the long side, optionally binarized."""
+    from PIL import Image, ImageOps
+
+    config = ocr_config()
+    max_side = config.max_side if max_side is None else max_side
+    binarize = config.binarize if binarize is None else binarize
+    image = ImageOps.exif_transpose(image).convert('L')
+    if max_side and max(image.size) > max_side:
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+    if binarize:
+        image = _binarize(image)
+    return image
+
+
+class _Call:
+    """The tesseract processes started for one recognize() call, so they can be killed together."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.procs = []
+        self.stopped = False
+
+    def start(self, args, env):
+        with self.lock:
+            if self.stopped:
+                raise RuntimeError("OCR call cancelled")
+            proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+            self.procs.append(proc)
+        return proc
+
+    def stop(self):
+        with self.lock:
+            self.stopped = True
+            procs, self.procs = self.procs, []
+        for proc in procs:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+
+
+class OcrPool:
+    """Long-lived OCR threads; recognize() keeps results in input order."""
+
+    def __init__(self, config, workers=None):
+        self.config = config
+        self.workers = workers or config.workers
+        self.pid = os.getpid()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='ocr')
+        self._local = threading.local()
+
+    def recognize(self, image_paths, timeout=None, single_call=False):
+        """
+        OCR text per image; raises ExtractionTimeout if `timeout` seconds run out
+        first. With the CLI engine the images are split across the pool threads,
+        one tesseract each, unless single_call.
+        """
+        image_paths = list(image_paths)
+        if not image_paths:
+            return []
+        call = _Call()
+        if self.config.engine == 'tesserocr':
+            futures = [self._executor.submit(self._recognize_in_api, path) for path in image_paths]
+            return self._collect(futures, call, timeout)
+        # One tesseract process per thread, each taking an even share of the images
+        size = len(image_paths) if single_call else -(-len(image_paths) // self.workers)
+        batches = [image_paths[i:i + size] for i in range(0, len(image_paths), size)]
+        futures = [self._executor.submit(self._recognize_with_cli, batch, call) for batch in batches]
+        return [text for texts in self._collect(futures, call, timeout) for text in texts]
+
+    def _collect(self, futures, call, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            results = []
+            for future in futures:
+                left = None if deadline is None else max(0.0, deadline - time.monotonic())
+                results.append(future.result(timeout=left))
+            return results
+        except FuturesTimeout:
+            raise ExtractionTimeout()
+        finally:
+            # Nothing left to do for the rest once one failed, timed out or the alarm fired
+            for future in futures:
+                future.cancel()
+            call.stop()
+
+    def _api(self):
+        api = getattr(self._local, 'api', None)
+        if api is None:
+            import tesserocr
+
+            kwargs = {'lang': self.config.lang, 'psm': self.config.psm}
+            if self.config.tessdata_dir:
+                kwargs['path'] = os.path.join(self.config.tessdata_dir, '')
+            try:
+                api = tesserocr.PyTessBaseAPI(**kwargs)
+            except RuntimeError as e:
+                raise OcrUnavailable(str(e)) from e
+            self._local.api = api
+        return api
+
+    def _recognize_in_api(self, image_path):
+        from PIL import Image
+
+        api = self._api()
+        with Image.open(image_path) as image:
+            api.SetImage(prepare_image(image))
+        return api.GetUTF8Text()
+
+    def _recognize_with_cli(self, image_paths, call):
+        from PIL import Image
+
+        config = self.config
+        with tempfile.TemporaryDirectory(prefix='ats-ocr-') as tmp:
+            prepared = []
+            for i, image_path in enumerate(image_paths):
+                path = os.path.join(tmp, f'{i:05d}.png')
+                with Image.open(image_path) as image:
+                    prepare_image(image).save(path)
+                prepared.append(path)
+            list_file = os.path.join(tmp, 'images.txt')
+            with open(list_file, 'w') as fh:
+                fh.write('\n'.join(prepared) + '\n')
+
+            args = [config.cmd, list_file, 'stdout', '-l', config.lang, '--psm', str(config.psm)]
+            if config.tessdata_dir:
+                args += ['--tessdata-dir', config.tessdata_dir]
+            # Parallelism comes from the pool threads (and extraction processes), sized to the
+            # cores between them; keep each tesseract single-threaded
+            env = dict(os.environ, OMP_THREAD_LIMIT='1')
+            try:
+                proc = call.start(args, env)
+            except FileNotFoundError as e:
+                raise OcrUnavailable(f"tesseract not found ({config.cmd})") from e
+            stdout, stderr = proc.communicate()
+            if call.stopped:
+                raise RuntimeError("OCR call cancelled")
+            if proc.returncode != 0:
+                raise OcrUnavailable(stderr.decode('utf-8', 'replace').strip())
+        # Tesseract ends every image's text with a form feed
+        pages = stdout.decode('utf-8', 'replace').split('\f')
+        if len(pages) < len(image_paths):
+            raise RuntimeError(f"tesseract returned {len(pages)} page(s) for {len(image_paths)} image(s)")
+        return pages[:len(image_paths)]
+
+
+def limit_workers(workers):
+    """Caps this process's OCR threads; extraction pool processes each get their share of the cores."""
+    global _worker_limit
+    _worker_limit = max(1, workers)
+
+
+def get_pool():
+    """The process's OcrPool (a fresh one after fork, threads don't survive it, or a changed limit)."""
+    global _pool
+    config = ocr_config()
+    workers = min(config.workers, _worker_limit or config.workers)
+    with _lock:
+        if _pool is None or _pool.pid != os.getpid() or _pool.workers != workers:
+            if _pool is not None and _pool.pid == os.getpid():
+                _pool._executor.shutdown(wait=False)
+            _pool = OcrPool(config, workers)
+        return _pool
+
+
+def recognize_files(image_paths, timeout=None, single_call=False):
+    """OCR text of each image file, in order. Raises ExtractionTimeout after `timeout` seconds."""
+    return get_pool().recognize(image_paths, timeout=timeout, single_call=single_call)
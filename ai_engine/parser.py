@@ -1,8 +1,58 @@
+import io
+import multiprocessing
 import os
 import re
-from pdfminer.high_level import extract_text
+import signal
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pdfminer.converter import TextConverter
+from pdfminer.layout import LAParams
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
 import docx
 
+# ocr: the text was recovered by OCR (image or scanned PDF); pages: pages read, None when not paged
+DocumentText = namedtuple('DocumentText', ['text', 'ocr', 'pages'])
+ExtractionResult = namedtuple(
+    'ExtractionResult', ['file_path', 'text', 'error', 'seconds', 'ocr', 'pages'], defaults=(False, None),
+)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+# Bump when a change to the extractors alters their output; cached extractions of
+# older versions are redone (see ai_engine.extraction_cache)
+EXTRACTION_RULES_VERSION = 1
+
+# Embedded PDF images smaller than this (in pixels) are logos or rules, not text: ocr_pdf skips them
+MIN_OCR_IMAGE_PIXELS = 40000
+
+# pages_read counts parsed pages; truncated means a page or character budget stopped extraction early
+PdfText = namedtuple('PdfText', ['text', 'pages_read', 'page_seconds', 'truncated'])
+
+
+class ExtractionTimeout(BaseException):
+    """Raised inside a pool process when one file exceeds its time budget.
+    BaseException so the broad `except Exception` handlers in the extractors don't swallow it."""
+
+
+# time.monotonic() at which the file being extracted in this worker process runs out of budget
+_deadline = None
+
+
+def _time_left():
+    """Seconds left of the current file's budget (None without one), handed to OCR as its timeout."""
+    return None if _deadline is None else max(0.0, _deadline - time.monotonic())
+
+
+# extract_many's process pool, shared by every call in this process (see _get_executor)
+_executor = None
+_executor_workers = 0
+_executor_pid = None
+_executor_lock = threading.Lock()
+
 def clean_text(text):
     """
     Removes extra whitespace and cleans up the text.
@@ -13,13 +63,216 @@ def clean_text(text):
     text = re.sub(r'\s+', ' ', text)
     return text.strip()
 
-def extract_text_from_pdf(pdf_path):
+def _setting(name, default):
+    """Django setting when settings are configured (the parser also runs standalone)."""
     try:
-        text = extract_text(pdf_path)
-        return clean_text(text)
+        from django.conf import settings
+        return getattr(settings, name, default)
+    except Exception:
+        return default
+
+
+def _laparams(layout):
+    """
+    'full': pdfminer's default layout analysis (what extract_text uses).
+    'fast': skips the hierarchical text-box grouping (boxes_flow=None) and
+            vertical-text detection, the costly parts on dense pages.
+    'none': no layout analysis; text comes out in content-stream order.
+    """
+    if layout == 'none':
+        return None
+    if layout == 'fast':
+        return LAParams(boxes_flow=None, detect_vertical=False, all_texts=False)
+    return LAParams()
+
+
+def iter_pdf_pages(pdf_path, layout='fast'):
+    """Yields (page_text, seconds) one page at a time; pages after the caller stops are never parsed."""
+    laparams = _laparams(layout)
+    rsrcmgr = PDFResourceManager(caching=True)
+    with open(pdf_path, 'rb') as fp:
+        pages = PDFPage.get_pages(fp)
+        while True:
+            started = time.perf_counter()
+            page = next(pages, None)
+            if page is None:
+                return
+            out = io.StringIO()
+            device = TextConverter(rsrcmgr, out, laparams=laparams)
+            try:
+                PDFPageInterpreter(rsrcmgr, device).process_page(page)
+            finally:
+                device.close()
+            yield out.getvalue(), time.perf_counter() - started
+
+
+def extract_pdf(pdf_path, max_pages=None, max_chars=None, layout=None):
+    """
+    Page-by-page PDF extraction that stops once `max_pages` pages or `max_chars`
+    characters have been read (settings.ATS_PDF_MAX_PAGES / ATS_PDF_MAX_CHARS;
+    0 = no limit), so oversize documents cost about as much as a normal resume.
+    Returns PdfText with the raw text and per-page timings.
+    """
+    max_pages = _setting('ATS_PDF_MAX_PAGES', 10) if max_pages is None else max_pages
+    max_chars = _setting('ATS_PDF_MAX_CHARS', 50000) if max_chars is None else max_chars
+    layout = layout or _setting('ATS_PDF_LAYOUT', 'fast')
+
+    parts = []
+    page_seconds = []
+    chars = 0
+    truncated = False
+    for page_text, seconds in iter_pdf_pages(pdf_path, layout):
+        parts.append(page_text)
+        page_seconds.append(seconds)
+        chars += len(page_text)
+        if (max_chars and chars >= max_chars) or (max_pages and len(parts) >= max_pages):
+            truncated = True
+            break
+    text = "".join(parts)
+    if max_chars:
+        text = text[:max_chars]
+    if truncated:
+        slowest = max(range(len(page_seconds)), key=page_seconds.__getitem__)
+        print(
+            f"PDF budget reached for {os.path.basename(pdf_path)}: {len(parts)} page(s), {chars} chars "
+            f"in {sum(page_seconds):.2f}s (slowest page {slowest + 1}: {page_seconds[slowest]:.2f}s)"
+        )
+    return PdfText(text, len(parts), page_seconds, truncated)
+
+
+def extract_pdf_document(pdf_path):
+    """
+    Text layer first. A PDF whose text layer is (nearly) empty is a scan: its
+    page images are OCR'd instead (settings.ATS_PDF_OCR).
+    """
+    try:
+        result = extract_pdf(pdf_path)
     except Exception as e:
         print(f"Error reading PDF {pdf_path}: {e}")
-        return ""
+        return DocumentText("", False, None)
+    text = clean_text(result.text)
+    min_chars = _setting('ATS_OCR_MIN_CHARS_PER_PAGE', 25) * max(1, result.pages_read)
+    if len(text) < min_chars and _setting('ATS_PDF_OCR', True):
+        try:
+            ocr_text, pages = ocr_pdf(pdf_path)
+        except Exception as e:
+            print(f"Error running OCR on PDF {pdf_path}: {e}")
+        else:
+            ocr_text = clean_text(ocr_text)
+            if len(ocr_text) > len(text):
+                return DocumentText(ocr_text, True, pages)
+    return DocumentText(text, False, result.pages_read)
+
+
+def extract_text_from_pdf(pdf_path):
+    return extract_pdf_document(pdf_path).text
+
+
+def _page_images(layout_obj):
+    from pdfminer.layout import LTContainer, LTImage
+
+    if isinstance(layout_obj, LTImage):
+        yield layout_obj
+    elif isinstance(layout_obj, LTContainer):
+        for child in layout_obj:
+            yield from _page_images(child)
+
+
+def _open_page_images(images, writer):
+    """Exports and opens each image as a grayscale PIL image; ones that fail (JBIG2, odd filters) are skipped."""
+    from PIL import Image
+
+    opened = []
+    for image in images:
+        try:
+            with Image.open(os.path.join(writer.outdir, writer.export_image(image))) as pil_image:
+                opened.append((image, pil_image.convert('L')))
+        except Exception as e:
+            print(f"Skipping unreadable PDF image {image.name}: {e}")
+    return opened
+
+
+def _compose_page(opened, rotate):
+    """
+    One upright image of the page. The layout boxes already follow the page's
+    /Rotate but the image pixels don't, so each image is turned first, then
+    pasted at its position on a white canvas (at the finest image resolution).
+    """
+    from PIL import Image
+
+    if rotate % 360:
+        # /Rotate is clockwise; PIL rotates counter-clockwise
+        opened = [(image, pil_image.rotate(-rotate, expand=True)) for image, pil_image in opened]
+    if len(opened) == 1:
+        return opened[0][1]
+    x0 = min(image.x0 for image, _ in opened)
+    y1 = max(image.y1 for image, _ in opened)
+    width = max(image.x1 for image, _ in opened) - x0
+    height = y1 - min(image.y0 for image, _ in opened)
+    # Pixels per PDF point of the sharpest image
+    scale = max(pil_image.width / max(image.width, 1e-6) for image, pil_image in opened)
+    page_image = Image.new('L', (max(1, round(width * scale)), max(1, round(height * scale))), 255)
+    for image, pil_image in opened:
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        page_image.paste(
+            pil_image.resize(size) if pil_image.size != size else pil_image,
+            (round((image.x0 - x0) * scale), round((y1 - image.y1) * scale)),
+        )
+    return page_image
+
+
+def iter_pdf_page_images(pdf_path, out_dir, max_pages=None):
+    """
+    Yields, per page, the file path of an upright image of the page written to
+    out_dir: its embedded images of at least MIN_OCR_IMAGE_PIXELS (in a scanned
+    PDF, the page scan itself, or every strip of it) turned by the page
+    rotation and composed at their positions. Images that can't be exported
+    or decoded are skipped; pages without usable images are skipped too.
+    """
+    from pdfminer.converter import PDFPageAggregator
+    from pdfminer.image import ImageWriter
+
+    writer = ImageWriter(out_dir)
+    rsrcmgr = PDFResourceManager(caching=True)
+    device = PDFPageAggregator(rsrcmgr, laparams=None)
+    interpreter = PDFPageInterpreter(rsrcmgr, device)
+    with open(pdf_path, 'rb') as fp:
+        for number, page in enumerate(PDFPage.get_pages(fp), 1):
+            path = None
+            try:
+                interpreter.process_page(page)
+                images = [
+                    image for image in _page_images(device.get_result())
+                    if image.srcsize[0] * image.srcsize[1] >= MIN_OCR_IMAGE_PIXELS
+                ]
+                opened = _open_page_images(images, writer)
+                if opened:
+                    path = os.path.join(out_dir, f'page-{number:04d}.png')
+                    _compose_page(opened, page.rotate or 0).save(path)
+            except Exception as e:
+                print(f"Skipping page {number} of {pdf_path} for OCR: {e}")
+                path = None
+            if path:
+                yield path
+            if max_pages and number >= max_pages:
+                return
+
+
+def ocr_pdf(pdf_path, max_pages=None):
+    """
+    OCR for an image-only PDF: the page scans are pulled out of the PDF and
+    recognized in parallel on the OCR pool (ai_engine.ocr). Returns
+    (text, pages_ocred).
+    """
+    from .ocr import recognize_files
+
+    max_pages = _setting('ATS_PDF_MAX_PAGES', 10) if max_pages is None else max_pages
+    with tempfile.TemporaryDirectory(prefix='ats-ocr-') as tmp:
+        image_paths = list(iter_pdf_page_images(pdf_path, tmp, max_pages))
+        if not image_paths:
+            return "", 0
+        texts = recognize_files(image_paths, timeout=_time_left())
+    return "\n".join(texts), len(image_paths)
 
 def extract_text_from_docx(docx_path):
     try:
@@ -35,68 +288,214 @@ def extract_text_from_docx(docx_path):
 
 def extract_text_from_image(image_path):
     try:
-        from PIL import Image
-        import pytesseract
-
-        # Set tesseract path if not in PATH (common Windows paths)
-        tesseract_cmd_paths = [
-            r'C:\Program Files\Tesseract-OCR\tesseract.exe',
-            r'C:\Program Files (x86)\Tesseract-OCR\tesseract.exe',
-            r'D:\jalak\Resume ATS Checker\ATS-Resume-Repo\tesseract.exe',
-            # Add other potential paths here if needed
-        ]
-        
-        # Check if tesseract is in PATH, if not try specific paths
-        if not pytesseract.pytesseract.tesseract_cmd or not os.path.exists(pytesseract.pytesseract.tesseract_cmd):
-            for path in tesseract_cmd_paths:
-                if os.path.exists(path):
-                    pytesseract.pytesseract.tesseract_cmd = path
-                    break
-        
-        # Check for TESSDATA_PREFIX
-        # If tesseract is installed in C:\Program Files but data is in D:\Repo\tessdata
-        tessdata_paths = [
-            r'D:\jalak\Resume ATS Checker\ATS-Resume-Repo\tessdata',
-            r'C:\Program Files\Tesseract-OCR\tessdata',
-            r'C:\Program Files (x86)\Tesseract-OCR\tessdata',
-        ]
-        
-        # Only set if not already set or if default doesn't work (we assume it might not if we are here)
-        if 'TESSDATA_PREFIX' not in os.environ:
-             for path in tessdata_paths:
-                 if os.path.exists(os.path.join(path, 'eng.traineddata')):
-                     os.environ['TESSDATA_PREFIX'] = path
-                     break
-                 # Also check if it's in the root (flat install case)
-                 elif os.path.exists(os.path.join(os.path.dirname(path), 'eng.traineddata')):
-                      # os.path.dirname(path) would be e.g. C:\Program Files\Tesseract-OCR
-                      # But wait, TESSDATA_PREFIX usually wants the parent of tessdata OR the folder itself?
-                      # Let's stick to the folder containing .traineddata if possible, or tesseract specific quirk.
-                      # We found earlier that pointing to the folder containing .traineddata works (path 2).
-                      pass
-
-        text = pytesseract.image_to_string(Image.open(image_path))
-        return clean_text(text)
+        from .ocr import recognize_files
+
+        return clean_text(recognize_files([image_path], timeout=_time_left())[0])
     except ImportError:
-        print("Error: pytesseract or Pillow not installed.")
+        print("Error: Pillow not installed.")
         return ""
     except Exception as e:
         print(f"Error reading Image {image_path}: {e}")
         return ""
 
-def extract_resume_text(file_path):
+def extract_document(file_path):
     """
-    Detects file type and extracts text accordingly.
+    Detects file type and extracts text accordingly. Returns DocumentText
+    (text, whether OCR produced it, pages read).
     """
     ext = os.path.splitext(file_path)[1].lower()
     if ext == '.pdf':
-        return extract_text_from_pdf(file_path)
+        return extract_pdf_document(file_path)
     elif ext == '.docx':
-        return extract_text_from_docx(file_path)
-    elif ext in ['.jpg', '.jpeg', '.png']:
-        return extract_text_from_image(file_path)
+        return DocumentText(extract_text_from_docx(file_path), False, None)
+    elif ext in IMAGE_EXTENSIONS:
+        return DocumentText(extract_text_from_image(file_path), True, 1)
     else:
         # TODO: Add .doc support if needed
         pass
-    return ""
+    return DocumentText("", False, None)
+
+def extract_resume_text(file_path):
+    """
+    Detects file type and extracts text accordingly.
+    """
+    return extract_document(file_path).text
+
+
+def _raise_extraction_timeout(signum, frame):
+    raise ExtractionTimeout()
+
 
+def _extract_in_worker(file_path, timeout):
+    """Runs in a pool process: extracts one file under an alarm-based time budget (POSIX)."""
+    global _deadline
+    use_alarm = bool(timeout) and hasattr(signal, 'SIGALRM')
+    started = time.perf_counter()
+    _deadline = time.monotonic() + timeout if timeout else None
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_extraction_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        document = extract_document(file_path)
+        return document.text, None, time.perf_counter() - started, document.ocr, document.pages
+    except ExtractionTimeout:
+        return "", 'timeout', time.perf_counter() - started, False, None
+    except Exception as e:
+        return "", str(e), time.perf_counter() - started, False, None
+    finally:
+        _deadline = None
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _extract_batch_in_worker(file_paths, timeout, ocr_workers=None):
+    """
+    Runs in a pool process: extracts a batch of files, returning
+    (file_path, text, error, seconds, ocr, pages) rows. A batch of several
+    images goes to the OCR pool in one call, so OCR start-up is paid once for
+    the batch; if that fails, its files are retried one by one. `ocr_workers`
+    caps this process's OCR threads at its share of the cores.
+    """
+    if ocr_workers:
+        from .ocr import limit_workers
+
+        limit_workers(ocr_workers)
+    if len(file_paths) > 1:
+        use_alarm = bool(timeout) and hasattr(signal, 'SIGALRM')
+        started = time.perf_counter()
+        if use_alarm:
+            signal.signal(signal.SIGALRM, _raise_extraction_timeout)
+            signal.setitimer(signal.ITIMER_REAL, timeout * len(file_paths))
+        try:
+            from .ocr import recognize_files
+
+            texts = recognize_files(
+                file_paths, timeout=timeout * len(file_paths) if timeout else None, single_call=True,
+            )
+        except ExtractionTimeout:
+            texts = None
+        except Exception as e:
+            print(f"Batch OCR failed, retrying {len(file_paths)} image(s) one by one: {e}")
+            texts = None
+        finally:
+            if use_alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+        if texts is not None:
+            seconds = (time.perf_counter() - started) / len(file_paths)
+            return [(path, clean_text(text), None, seconds, True, 1) for path, text in zip(file_paths, texts)]
+    return [(path, *_extract_in_worker(path, timeout)) for path in file_paths]
+
+
+def _get_executor(workers):
+    """
+    The process's extraction pool, created on first use and reused by later
+    calls; recreated when it is broken or a call needs more workers. Its
+    processes are started by a forkserver (spawn where there is none), not
+    forked from this multithreaded process.
+    """
+    global _executor, _executor_workers, _executor_pid
+    with _executor_lock:
+        if (
+            _executor is None or _executor_pid != os.getpid()
+            or _executor_workers < workers or getattr(_executor, '_broken', False)
+        ):
+            if _executor is not None and _executor_pid == os.getpid():
+                _executor.shutdown(wait=False, cancel_futures=True)
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+            _executor_workers = workers
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _discard_executor(executor):
+    """Kills a pool with a hung worker; the next extract_many call starts a fresh one."""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in list((getattr(executor, '_processes', None) or {}).values()):
+        process.terminate()
+
+
+def extract_many(file_paths, workers=None, timeout=None):
+    """
+    Extracts text from many files in parallel on the process's shared
+    ProcessPoolExecutor, keeping at most `workers` batches in flight. Yields ExtractionResult(file_path, text, error, seconds, ocr, pages) in completion
+    order; error is None on success, 'timeout' when a file exceeded `timeout` seconds.
+    A file that hangs is flagged and skipped instead of stalling the batch.
+    """
+    file_paths = list(file_paths)
+    if not file_paths:
+        return
+    workers = max(1, min(workers or os.cpu_count() or 1, len(file_paths)))
+    # Photo resumes go to the workers in batches (settings.ATS_OCR_BATCH_SIZE), one OCR call each
+    images = [path for path in file_paths if os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS]
+    image_set = set(images)
+    batch_size = max(1, min(_setting('ATS_OCR_BATCH_SIZE', 8), -(-len(images) // workers)))
+    batches = [[path] for path in file_paths if path not in image_set]
+    batches += [images[i:i + batch_size] for i in range(0, len(images), batch_size)]
+    workers = min(workers, len(batches))
+    # Each process gets its share of the cores for OCR (image batches are one tesseract call
+    # each either way), so the box never runs workers x cores tesseracts
+    ocr_workers = max(1, (os.cpu_count() or 1) // workers)
+    # Grace period for the parent-side check; normally the in-worker alarm fires first
+    deadline_grace = 5.0
+    executor = _get_executor(workers)
+    remaining = iter(batches)
+    pending = {}
+    failed = []
+    hung = False
+
+    def submit_next():
+        batch = next(remaining, None)
+        if batch is None:
+            return
+        try:
+            future = executor.submit(_extract_batch_in_worker, batch, timeout, ocr_workers)
+        except BrokenProcessPool as e:
+            failed.extend(ExtractionResult(file_path, "", str(e), 0.0) for file_path in batch)
+        else:
+            pending[future] = (batch, time.monotonic())
+
+    try:
+        # Keep at most one batch per worker in flight so submit time ~ start time
+        for _ in range(workers):
+            submit_next()
+        while pending:
+            done, _ = wait(pending, timeout=1.0 if timeout else None, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch, _ = pending.pop(future)
+                try:
+                    rows = future.result()
+                except Exception as e:
+                    rows = [(file_path, "", str(e), 0.0) for file_path in batch]
+                for row in rows:
+                    yield ExtractionResult(*row)
+                submit_next()
+            if timeout:
+                now = time.monotonic()
+                for future, (batch, submitted) in list(pending.items()):
+                    # A batch may legitimately use each file's budget in turn, plus a retry
+                    budget = timeout * (2 * len(batch) if len(batch) > 1 else 1)
+                    if now - submitted > budget + deadline_grace:
+                        pending.pop(future)
+                        hung = True
+                        for file_path in batch:
+                            print(f"Extraction timed out for {file_path}")
+                            yield ExtractionResult(file_path, "", 'timeout', now - submitted)
+                        submit_next()
+            while failed:
+                yield failed.pop()
+        # Only left over if the pool broke (a worker process died)
+        for batch in remaining:
+            for file_path in batch:
+                yield ExtractionResult(file_path, "", 'extraction worker crashed', 0.0)
+    finally:
+        for future in pending:
+            future.cancel()
+        if hung:
+            # A worker ignored the alarm; don't let it outlive the batch
+            _discard_executor(executor)
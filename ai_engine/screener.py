@@ -2,59 +2,232 @@ import spacy
 from typing import List, Set, Tuple
 import numpy as np
 
+from .matcher import keyword_matcher
+
 # Global cache for heavy models
 _nlp = None
 _model = None
 _use_fallback = False
+# Inference daemon client (ai_engine.inference_server); _local_only is set inside the daemon itself
+_client = None
+_local_only = False
+# Identity of the vectors _model produces, see encoder_key()
+_encoder_key = None
+
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+# Keyword extraction only reads is_alpha and lemma_: the lemmatizer needs the tagger's POS tags
+# (tok2vec -> tagger -> attribute_ruler -> lemmatizer), the parser and NER are never used
+SPACY_EXCLUDED_COMPONENTS = ["parser", "ner", "senter"]
 
 def get_nlp():
     """
     Returns a spaCy NLP object.
-    - Tries to load 'en_core_web_sm'
-    - If unavailable and download fails, falls back to a lightweight blank English pipeline
+    - Tries to load 'en_core_web_sm' (installed at build time, see build.sh)
+      with only the components keyword extraction needs
+    - If unavailable, falls back to a lightweight blank English pipeline
       so the app never crashes just because the model isn't installed.
+      The model is never downloaded here: that would stall a request for minutes.
     """
     global _nlp
     if _nlp is None:
         try:
-            _nlp = spacy.load("en_core_web_sm")
-        except Exception:
-            try:
-                import subprocess
-                subprocess.run(
-                    ["python", "-m", "spacy", "download", "en_core_web_sm"],
-                    check=False,
-                )
-                _nlp = spacy.load("en_core_web_sm")
-            except Exception:
-                # Last-resort fallback: simple tokenizer-only pipeline
-                _nlp = spacy.blank("en")
+            _nlp = spacy.load("en_core_web_sm", exclude=SPACY_EXCLUDED_COMPONENTS)
+        except Exception as e:
+            print(f"AI Engine: spaCy model en_core_web_sm unavailable ({e}). Using a blank English pipeline.")
+            # Last-resort fallback: simple tokenizer-only pipeline
+            _nlp = spacy.blank("en")
     return _nlp
 
+def inference_client():
+    """Client for the inference daemon when settings.ATS_INFERENCE_SOCKET is set, else None."""
+    global _client
+    if _client is None and not _local_only:
+        from django.conf import settings
+        address = getattr(settings, 'ATS_INFERENCE_SOCKET', '')
+        if address:
+            from .inference_server import InferenceClient
+            _client = InferenceClient(address, authkey=settings.SECRET_KEY.encode())
+    return _client
+
+def use_local_models():
+    """Always run the models in this process (used by the inference daemon itself)."""
+    global _local_only, _client
+    _local_only = True
+    _client = None
+
+def backend_encoder_key(backend, onnx_file=''):
+    """
+    Cache/index key for the vectors of EMBEDDING_MODEL_NAME run on a backend.
+    Quantized backends produce slightly different vectors from the fp32 torch
+    reference, so they never share cached embeddings or an index with it.
+    """
+    if backend == 'torch':
+        return EMBEDDING_MODEL_NAME
+    if backend == 'onnx' and onnx_file:
+        return f"{EMBEDDING_MODEL_NAME}:onnx:{onnx_file}"
+    return f"{EMBEDDING_MODEL_NAME}:{backend}"
+
+def encoder_key():
+    """Key of the active encoder (local, or the inference daemon's) for the embedding cache and vector index."""
+    get_model()
+    return _encoder_key
+
 def get_model():
-    global _model, _use_fallback
+    global _model, _use_fallback, _encoder_key
     if _model is None:
-        try:
-            from sentence_transformers import SentenceTransformer, util
-            _model = SentenceTransformer('all-MiniLM-L6-v2')
-            _use_fallback = False
-            print("AI Engine: Loaded Sentence Transformers successfully.")
-        except Exception as e:
-            print(f"AI Engine: Failed to load Sentence Transformers ({e}). Switching to TF-IDF fallback.")
-            from sklearn.feature_extraction.text import TfidfVectorizer
-            from sklearn.metrics.pairwise import cosine_similarity
-            _model = TfidfVectorizer(stop_words='english')
-            _use_fallback = True
+        client = inference_client()
+        if client is not None:
+            from .inference_server import InferenceUnavailable, RemoteEncoder
+            try:
+                info = client.info()
+                if not info['fallback'] and info['model_name'] == EMBEDDING_MODEL_NAME:
+                    _model = RemoteEncoder(client)
+                    _use_fallback = False
+                    _encoder_key = info['encoder_key']
+                    print("AI Engine: Using the shared inference server.")
+                    return _model
+            except InferenceUnavailable as e:
+                print(f"AI Engine: Inference server unavailable ({e}). Loading models in-process.")
+        _load_local_model()
     return _model
 
+def _load_local_model():
+    global _model, _use_fallback, _encoder_key
+    from django.conf import settings
+    from .encoders import load_encoder
+    backend = getattr(settings, 'ATS_ENCODER_BACKEND', 'torch')
+    onnx_file = getattr(settings, 'ATS_ENCODER_ONNX_FILE', '')
+    try:
+        _model = load_encoder(
+            EMBEDDING_MODEL_NAME,
+            backend=backend,
+            threads=getattr(settings, 'ATS_ENCODER_THREADS', 0),
+            onnx_file=onnx_file,
+        )
+        _use_fallback = False
+        _encoder_key = backend_encoder_key(backend, onnx_file)
+        print(f"AI Engine: Loaded Sentence Transformers successfully ({backend} backend).")
+    except Exception as e:
+        print(f"AI Engine: Failed to load Sentence Transformers ({e}). Switching to TF-IDF fallback.")
+        _load_fallback_model()
+    return _model
+
+def _load_fallback_model():
+    global _model, _use_fallback
+    from django.conf import settings
+    from .tfidf import TfidfScorer
+    _model = TfidfScorer(
+        corpus=_stored_resume_corpus,
+        n_features=getattr(settings, 'ATS_TFIDF_FEATURES', 2 ** 18),
+        max_cached=getattr(settings, 'ATS_TFIDF_CACHE_SIZE', 20000),
+    )
+    _use_fallback = True
+    return _model
+
+def use_fallback_model():
+    """
+    Switches this process to a fresh TF-IDF fallback without trying the sentence
+    encoder or the inference daemon (offline benchmarks).
+    """
+    use_local_models()
+    return _load_fallback_model()
+
+def _stored_resume_corpus():
+    """Parsed text of every stored resume, streamed; seeds the TF-IDF fallback's IDF table."""
+    from django.apps import apps
+    Resume = apps.get_model('resumes', 'Resume')
+    return Resume.objects.exclude(parsed_content='').values_list('parsed_content', flat=True).iterator(chunk_size=500)
+
+def preload_models():
+    """
+    Loads spaCy and the sentence encoder now instead of on the first request.
+    Called at WSGI startup; under gunicorn's preload_app that is the master
+    process, so workers share the weights copy-on-write after fork. With the
+    inference daemon configured only the connection is checked.
+    """
+    get_model()
+    if inference_client() is None:
+        get_nlp()
+
+
+def warm_up():
+    """
+    Runs one tiny inference through each model so lazy initialisation (thread
+    pools, tokenizer caches) is paid at worker start, not by the first request.
+    Bypasses the embedding cache: no database access.
+    """
+    preload_models()
+    _extract_keywords_uncached(["warm up"])
+    if not _use_fallback:
+        _encode_uncached(["warm up"], batch_size=1)
+
+
+def is_fallback():
+    """True when the TF-IDF fallback is active instead of the sentence encoder."""
+    get_model()
+    return _use_fallback
+
 def extract_keywords(text):
     """
     Extracts potential keywords from text using spaCy.
     Works with both full models and the blank fallback by relying only on
     tokenization, alpha filtering, and simple length heuristics.
     """
-    nlp = get_nlp()
-    doc = nlp(text or "")
+    return extract_keywords_many([text])[0]
+
+def extract_keywords_many(texts, batch_size=None, n_process=None, use_cache=True):
+    """
+    Keyword lists for many texts, streamed through nlp.pipe in batches of
+    `batch_size` across `n_process` processes (settings.ATS_SPACY_BATCH_SIZE /
+    ATS_SPACY_N_PROCESS). Results are memoised per text (ai_engine.keyword_cache),
+    so a JD already seen never goes through spaCy again.
+    """
+    texts = [t or "" for t in texts]
+    if not texts or not use_cache:
+        return _extract_keywords_uncached(texts, batch_size, n_process)
+
+    from . import keyword_cache
+    hashes = [keyword_cache.text_hash(t) for t in texts]
+    try:
+        cached = keyword_cache.get_cached_keywords(hashes)
+    except Exception as e:
+        print(f"Keyword cache unavailable ({e}); extracting without it.")
+        return _extract_keywords_uncached(texts, batch_size, n_process)
+
+    missing = {}
+    for h, t in zip(hashes, texts):
+        if h not in cached and h not in missing:
+            missing[h] = t
+    if missing:
+        new_lists = _extract_keywords_uncached(list(missing.values()), batch_size, n_process)
+        cached.update(zip(missing.keys(), new_lists))
+        try:
+            keyword_cache.store_keywords(list(missing.keys()), new_lists)
+        except Exception as e:
+            print(f"Keyword cache write failed: {e}")
+    return [list(cached[h]) for h in hashes]
+
+def _extract_keywords_uncached(texts, batch_size=None, n_process=None):
+    """Runs in the inference daemon when one is configured (until this process has had to load its own pipeline)."""
+    if not texts:
+        return []
+    client = inference_client()
+    if client is not None and _nlp is None:
+        from .inference_server import InferenceUnavailable
+        try:
+            return client.keywords(texts)
+        except InferenceUnavailable as e:
+            print(f"AI Engine: Inference server unavailable ({e}). Extracting keywords in-process.")
+
+    from django.conf import settings
+    batch_size = batch_size or getattr(settings, 'ATS_SPACY_BATCH_SIZE', 64)
+    n_process = n_process or getattr(settings, 'ATS_SPACY_N_PROCESS', 1)
+    if len(texts) < 2 * batch_size:
+        # Worker processes would cost more than they save
+        n_process = 1
+    return [_keywords_from_doc(doc) for doc in get_nlp().pipe(texts, batch_size=batch_size, n_process=n_process)]
+
+def _keywords_from_doc(doc):
     keywords = set()
     for token in doc:
         if token.is_alpha and len(token.text) > 2:
@@ -62,62 +235,204 @@ def extract_keywords(text):
             keywords.add(lemma)
     return list(keywords)
 
-def calculate_semantic_similarity(text1, text2):
+def _embedding_batch_size():
+    from django.conf import settings
+    return getattr(settings, 'ATS_EMBEDDING_BATCH_SIZE', 32)
+
+def encode_texts(texts, batch_size=None, use_cache=True):
     """
-    Calculates cosine similarity between two texts using sentence embeddings OR TF-IDF fallback.
+    Encodes texts with the sentence encoder in mini-batches.
+    Returns an (n, dim) float32 matrix of L2-normalised embeddings, so cosine
+    similarity between rows is a plain dot product.
+    Embeddings already in the persistent cache (ai_engine.embedding_cache) are
+    reused; only unseen texts go through the model.
     """
+    texts = [t or "" for t in texts]
+    if not use_cache or not texts:
+        return _encode_uncached(texts, batch_size)
+
+    from . import embedding_cache
+    if not embedding_cache.cache_enabled():
+        return _encode_uncached(texts, batch_size)
+
+    hashes = [embedding_cache.text_hash(t) for t in texts]
+    try:
+        key = encoder_key()
+        cached = embedding_cache.get_cached_embeddings(key, hashes)
+    except Exception as e:
+        print(f"Embedding cache unavailable ({e}); encoding without it.")
+        return _encode_uncached(texts, batch_size)
+
+    # Encode each distinct unseen text once
+    missing = {}
+    for h, t in zip(hashes, texts):
+        if h not in cached and h not in missing:
+            missing[h] = t
+    if missing:
+        new_embeddings = _encode_uncached(list(missing.values()), batch_size)
+        cached.update(zip(missing.keys(), new_embeddings))
+        try:
+            embedding_cache.store_embeddings(key, list(missing.keys()), new_embeddings)
+        except Exception as e:
+            print(f"Embedding cache write failed: {e}")
+
+    return np.vstack([cached[h] for h in hashes]).astype(np.float32, copy=False)
+
+def _encode_uncached(texts, batch_size=None):
+    from .inference_server import InferenceUnavailable
     model = get_model()
-    
+    kwargs = dict(
+        batch_size=batch_size or _embedding_batch_size(),
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    )
+    try:
+        embeddings = model.encode(texts, **kwargs)
+    except InferenceUnavailable as e:
+        # The daemon went away: this process loads its own encoder from now on
+        print(f"AI Engine: Inference server unavailable ({e}). Loading models in-process.")
+        model = _load_local_model()
+        if _use_fallback:
+            # No local encoder either; later calls take the TF-IDF path
+            raise
+        embeddings = model.encode(texts, **kwargs)
+    return np.asarray(embeddings, dtype=np.float32)
+
+def _chunk_settings():
+    from django.conf import settings
+    return (
+        getattr(settings, 'ATS_EMBEDDING_CHUNKING', False),
+        getattr(settings, 'ATS_CHUNK_WORDS', 160),
+        getattr(settings, 'ATS_CHUNK_OVERLAP', 40),
+        getattr(settings, 'ATS_CHUNK_MAX', 16),
+        getattr(settings, 'ATS_CHUNK_POOLING', 'max'),
+        getattr(settings, 'ATS_CHUNK_TOP_K', 3),
+    )
+
+def chunking_enabled():
+    return _chunk_settings()[0]
+
+def split_into_chunks(text, words=160, overlap=40, max_chunks=16):
+    """
+    Splits text into overlapping windows of `words` words (the encoder only
+    sees the first ~256 word pieces of its input). At most `max_chunks`
+    windows are kept; short texts come back as a single chunk.
+    """
+    tokens = (text or "").split()
+    if len(tokens) <= words:
+        return [" ".join(tokens)]
+    step = max(1, words - overlap)
+    starts = range(0, len(tokens) - overlap, step)
+    return [" ".join(tokens[start:start + words]) for start in starts][:max_chunks]
+
+def pool_chunk_scores(chunk_scores, counts, pooling='max', top_k=3):
+    """
+    Pools a (total_chunks x n_jds) similarity matrix into (n_resumes x n_jds),
+    where `counts[i]` consecutive rows belong to resume i: the best chunk
+    ('max') or the mean of the best `top_k` chunks ('topk').
+    """
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    if pooling == 'max':
+        return np.maximum.reduceat(chunk_scores, starts, axis=0)
+    pooled = np.empty((len(counts), chunk_scores.shape[1]), dtype=chunk_scores.dtype)
+    for i, (start, count) in enumerate(zip(starts, counts)):
+        block = chunk_scores[start:start + count]
+        k = min(top_k, count)
+        pooled[i] = np.partition(block, count - k, axis=0)[count - k:].mean(axis=0)
+    return pooled
+
+def resume_similarities(resume_texts, jd_embeddings, batch_size=None):
+    """
+    Cosine similarities (n_resumes x n_jds) of resumes against normalised JD
+    embeddings. With settings.ATS_EMBEDDING_CHUNKING every resume is split into
+    word windows, the chunks of all resumes are encoded in one batch (through
+    the embedding cache, so later JDs reuse them) and the per-chunk
+    similarities are pooled per resume. Otherwise each resume is encoded whole.
+    """
+    enabled, words, overlap, max_chunks, pooling, top_k = _chunk_settings()
+    if not enabled:
+        return encode_texts(resume_texts, batch_size=batch_size) @ jd_embeddings.T
+    chunks, counts = [], []
+    for text in resume_texts:
+        resume_chunks = split_into_chunks(text, words, overlap, max_chunks)
+        chunks.extend(resume_chunks)
+        counts.append(len(resume_chunks))
+    chunk_scores = encode_texts(chunks, batch_size=batch_size) @ jd_embeddings.T
+    return pool_chunk_scores(chunk_scores, counts, pooling, top_k)
+
+def score_resumes_against_jd(jd_text, resume_texts, batch_size=None, jd_embedding=None):
+    """
+    Semantic similarity (0-100) of every resume against one job description.
+    The JD is encoded once (or `jd_embedding` is reused), the resumes in
+    mini-batches of `batch_size` (as pooled chunks, see resume_similarities),
+    and all cosine similarities come out of a single matrix-vector product.
+    Returns a list of floats in the same order as `resume_texts`.
+    """
+    resume_texts = [t or "" for t in resume_texts]
+    if not resume_texts:
+        return []
+
+    model = get_model()
+
     if _use_fallback:
-        # TF-IDF approach
-        from sklearn.metrics.pairwise import cosine_similarity
+        # TF-IDF approach: corpus-wide IDF, cached sparse rows, one sparse product
         try:
-            tfidf_matrix = model.fit_transform([text1, text2])
-            score = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-            return float(score) * 100
+            scores = model.score(jd_text or "", resume_texts)
         except Exception as e:
             print(f"TF-IDF Error: {e}")
-            return 0.0
+            return [0.0] * len(resume_texts)
     else:
         # Sentence Transformers approach
-        from sentence_transformers import util
-        embeddings = model.encode([text1, text2])
-        score = util.cos_sim(embeddings[0], embeddings[1])
-        return float(score.item()) * 100
+        if jd_embedding is None:
+            jd_embedding = encode_texts([jd_text], batch_size=1)[0]
+        scores = resume_similarities(resume_texts, jd_embedding[None, :], batch_size=batch_size)[:, 0]
 
-def check_missing_skills(resume_text, required_skills):
+    return [float(score) * 100 for score in scores]
+
+def calculate_semantic_similarity(text1, text2):
+    """
+    Calculates cosine similarity between two texts using sentence embeddings OR TF-IDF fallback.
+    """
+    return score_resumes_against_jd(text2, [text1])[0]
+
+def check_missing_skills(resume_text, required_skills, skill_hits=None):
     """
     Checks which required skills are present in the resume text.
-    Naive, case-insensitive string matching.
+    Case-insensitive whole-word matching in one pass over the resume; common
+    inflections are accepted so lemmatised JD keywords ('manage') still match
+    'managed'. `skill_hits` may carry skills already matched by a shared
+    KeywordMatcher pass over the resume.
     """
     if isinstance(required_skills, str):
         # Handle if comma-separated string passed
         required_skills = [s.strip() for s in required_skills.split(',') if s.strip()]
-        
-    resume_lower = resume_text.lower()
-    missing = []
+
+    if skill_hits is None:
+        skill_hits = keyword_matcher(tuple(required_skills), 'inflected').match(resume_text)['keywords']
+
     matched = []
-    
+    missing = []
     for skill in required_skills:
-        skill_lower = skill.lower()
-        # Ensure we match whole words logic could be better, but simple substring for now
-        # Ideally use regex for boundaries: r'\b' + re.escape(skill_lower) + r'\b'
-        if skill_lower in resume_lower:
+        if skill in skill_hits:
             matched.append(skill)
         else:
             missing.append(skill)
             
     return matched, missing
 
-def calculate_resume_score(resume_text, job_description, required_skills, weights={'semantic': 0.6, 'skills': 0.4}):
+def calculate_resume_score(resume_text, job_description, required_skills, weights={'semantic': 0.6, 'skills': 0.4}, semantic_score=None, skill_hits=None):
     """
     Aggregates semantic score and skill match score.
+    Pass `semantic_score` when it was already computed in batch
+    (see score_resumes_against_jd) to skip encoding the pair again.
     """
     # 1. Semantic Match
-    semantic_score = calculate_semantic_similarity(resume_text, job_description)
+    if semantic_score is None:
+        semantic_score = calculate_semantic_similarity(resume_text, job_description)
     
     # 2. Skill Match
-    matched, missing = check_missing_skills(resume_text, required_skills)
+    matched, missing = check_missing_skills(resume_text, required_skills, skill_hits=skill_hits)
     total_skills = len(required_skills)
     
     if total_skills > 0:
@@ -1,3 +1,129 @@
+import os
+import tempfile
+
+import numpy as np
 from django.test import TestCase
 
-# Create your tests here.
+from .matcher import KeywordMatcher, keyword_matcher
+from .vector_index import VectorIndex, stored_model_name
+
+
+def unit_rows(count, dim=8, seed=0):
+    rows = np.random.default_rng(seed).normal(size=(count, dim)).astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+class VectorIndexTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+
+    def test_add_and_search(self):
+        index = VectorIndex(self.directory, 'model-a')
+        vectors = unit_rows(5)
+        index.add([10, 11, 12, 13, 14], vectors)
+
+        hits = index.search(vectors[2], 3)
+        self.assertEqual(len(hits), 3)
+        self.assertEqual(hits[0][0], 12)
+        self.assertAlmostEqual(hits[0][1], 1.0, places=5)
+        self.assertEqual([score for _, score in hits], sorted((score for _, score in hits), reverse=True))
+        self.assertEqual(stored_model_name(self.directory), 'model-a')
+
+    def test_add_replaces_existing_ids(self):
+        index = VectorIndex(self.directory, 'model-a')
+        vectors = unit_rows(3)
+        index.add([1, 2, 3], vectors)
+        index.add([2], vectors[:1])
+
+        self.assertEqual(index.size, 3)
+        self.assertEqual(sorted(id for id, _ in index.search(vectors[0], 2)), [1, 2])
+
+    def test_remove(self):
+        index = VectorIndex(self.directory, 'model-a')
+        vectors = unit_rows(4)
+        index.add([1, 2, 3, 4], vectors)
+        index.remove([2, 4, 99])
+
+        self.assertEqual(sorted(index.ids.tolist()), [1, 3])
+        self.assertNotIn(2, [id for id, _ in index.search(vectors[1], 4)])
+
+    def test_other_processes_see_writes(self):
+        writer = VectorIndex(self.directory, 'model-a')
+        reader = VectorIndex(self.directory, 'model-a')
+        vectors = unit_rows(2)
+        writer.add([1], vectors[:1])
+        self.assertEqual(reader.search(vectors[0], 1)[0][0], 1)
+
+        writer.add([2], vectors[1:])
+        self.assertEqual(reader.search(vectors[1], 1)[0][0], 2)
+
+    def test_other_model_is_not_loaded(self):
+        VectorIndex(self.directory, 'model-a').add([1], unit_rows(1))
+
+        index = VectorIndex(self.directory, 'model-b')
+        self.assertFalse(index.load())
+        self.assertEqual(index.search(unit_rows(1)[0], 1), [])
+
+    def test_old_versions_are_removed(self):
+        index = VectorIndex(self.directory, 'model-a')
+        index.add([1], unit_rows(1))
+        index.add([2], unit_rows(1, seed=1))
+        index.remove([1])
+
+        files = sorted(name for name in os.listdir(self.directory) if name.endswith('.npy'))
+        self.assertEqual(files, [f'ids-{index.version}.npy', f'vectors-{index.version}.npy'])
+
+    def test_ivf_search_keeps_centroids_across_adds(self):
+        index = VectorIndex(self.directory, 'model-a', ivf_min_size=200, nprobe=4)
+        vectors = unit_rows(300)
+        index.rebuild(range(300), vectors)
+        centroids = index.centroids
+        self.assertIsNotNone(centroids)
+
+        extra = unit_rows(20, seed=1)
+        index.add(range(300, 320), extra)
+        np.testing.assert_array_equal(index.centroids, centroids)
+        self.assertEqual(len(index.assignments), 320)
+        self.assertEqual(index.search(extra[5], 1)[0][0], 305)
+
+
+class KeywordMatcherTests(TestCase):
+    def test_word_mode_needs_whole_words(self):
+        matcher = KeywordMatcher({'skills': ['Java', 'JavaScript', 'Go', 'SQL']})
+
+        self.assertEqual(matcher.match("JavaScript and TypeScript")['skills'], {'JavaScript'})
+        self.assertEqual(matcher.match("Java 17, Spring")['skills'], {'Java'})
+        self.assertEqual(matcher.match("Golang, NoSQL, MySQL")['skills'], set())
+
+    def test_symbol_skill_names(self):
+        matcher = KeywordMatcher({'skills': ['C', 'C++', 'C#', '.NET']})
+
+        self.assertEqual(matcher.match("Senior C++ developer")['skills'], {'C++'})
+        self.assertEqual(matcher.match("C#/.NET Core services")['skills'], {'C#', '.NET'})
+        self.assertEqual(matcher.match("Embedded C and C++")['skills'], {'C', 'C++'})
+        self.assertEqual(matcher.match("ASP.NET MVC")['skills'], set())
+
+    def test_inflected_mode(self):
+        matcher = keyword_matcher(('manage', 'lead'), 'inflected')
+
+        self.assertEqual(matcher.match("Managed a team and led releases")['keywords'], {'manage'})
+        self.assertEqual(matcher.match("management experience; leading projects")['keywords'], {'manage', 'lead'})
+        self.assertEqual(matcher.match("managerial, leadership")['keywords'], set())
+
+    def test_prefix_mode(self):
+        matcher = KeywordMatcher({'sections': ['experience', 'educat']}, modes={'sections': 'prefix'})
+
+        self.assertEqual(matcher.match("Experienced engineer. Education: BSc")['sections'], {'experience', 'educat'})
+        self.assertEqual(matcher.match("inexperienced")['sections'], set())
+
+    def test_categories_share_one_pass(self):
+        matcher = KeywordMatcher(
+            {'certs': ['AWS Certified'], 'risks': ['terminated'], 'skills': ['AWS']},
+            modes={'risks': 'inflected'},
+        )
+
+        hits = matcher.match("AWS Certified engineer, never terminated")
+        self.assertEqual(hits, {'certs': {'AWS Certified'}, 'risks': {'terminated'}, 'skills': {'AWS'}})
+        self.assertEqual(matcher.match(""), {'certs': set(), 'risks': set(), 'skills': set()})
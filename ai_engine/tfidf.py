@@ -0,0 +1,116 @@
+"""
+TF-IDF scoring for when the sentence encoder is unavailable.
+
+A HashingVectorizer maps text to term counts without a fitted vocabulary,
+so it is stateless and safe to share between threads. IDF comes from a
+document-frequency table over the stored resume corpus: seeded once from
+the database on first use, then updated incrementally as new resumes are
+scored. Term-count rows are cached per text hash (LRU), so a JD is scored
+against N resumes with one sparse matrix product and no re-tokenizing.
+Weights follow TfidfVectorizer's defaults (raw tf, smoothed idf, L2 rows).
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+from .embedding_cache import text_hash
+
+
+class TfidfScorer:
+    def __init__(self, corpus=None, n_features=2 ** 18, max_cached=20000):
+        """
+        corpus: optional callable returning an iterable of document texts used
+        to seed the IDF table the first time anything is scored.
+        """
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features, alternate_sign=False, norm=None,
+            stop_words='english', dtype=np.float32,
+        )
+        self.n_features = n_features
+        self.max_cached = max_cached
+        self.df = np.zeros(n_features, dtype=np.float64)
+        self.n_docs = 0
+        self._corpus = corpus
+        self._seen = set()
+        self._rows = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _ensure_seeded(self):
+        if self._corpus is None:
+            return
+        with self._lock:
+            corpus, self._corpus = self._corpus, None
+            if corpus is None:
+                return
+            batch = []
+            for text in corpus():
+                batch.append(text or "")
+                if len(batch) == 500:
+                    self.add_documents(batch)
+                    batch = []
+            if batch:
+                self.add_documents(batch)
+
+    def counts(self, texts):
+        """Term-count rows (CSR) for texts, from the cache where possible."""
+        hashes = [text_hash(t) for t in texts]
+        with self._lock:
+            missing = {}
+            for h, t in zip(hashes, texts):
+                if h not in self._rows and h not in missing:
+                    missing[h] = t
+        if missing:
+            new_rows = self.vectorizer.transform(list(missing.values())).tocsr()
+            with self._lock:
+                for i, h in enumerate(missing):
+                    self._rows[h] = new_rows[i]
+        with self._lock:
+            rows = []
+            for h in hashes:
+                row = self._rows.get(h)
+                if row is None:
+                    # Evicted by a concurrent caller in between; recompute just this one
+                    row = self.vectorizer.transform([texts[hashes.index(h)]]).tocsr()
+                else:
+                    self._rows.move_to_end(h)
+                rows.append(row)
+            while len(self._rows) > self.max_cached:
+                self._rows.popitem(last=False)
+        return sp.vstack(rows, format='csr') if rows else sp.csr_matrix((0, self.n_features), dtype=np.float32)
+
+    def add_documents(self, texts):
+        """Counts unseen documents into the document-frequency table."""
+        hashes = [text_hash(t) for t in texts]
+        with self._lock:
+            new = [(h, t) for h, t in dict(zip(hashes, texts)).items() if h not in self._seen]
+            if not new:
+                return
+            rows = self.counts([t for _, t in new])
+            # Column indices are unique within each CSR row, so their counts are document frequencies
+            self.df += np.bincount(rows.indices, minlength=self.n_features)
+            self.n_docs += len(new)
+            self._seen.update(h for h, _ in new)
+
+    def transform(self, texts, known_terms_only=False):
+        """
+        L2-normalised TF-IDF rows for texts under the current IDF table.
+        known_terms_only drops terms no corpus document contains, as a fitted
+        vocabulary would (used for queries).
+        """
+        rows = self.counts(texts)
+        with self._lock:
+            idf = (np.log((1 + self.n_docs) / (1 + self.df)) + 1).astype(np.float32)
+            if known_terms_only:
+                idf[self.df == 0] = 0
+        return normalize(rows.multiply(idf[None, :]).tocsr())
+
+    def score(self, query, documents):
+        """Cosine similarities (0-1) of documents against query; documents join the corpus."""
+        self._ensure_seeded()
+        self.add_documents(documents)
+        q = self.transform([query], known_terms_only=True)
+        return (self.transform(documents) @ q.T).toarray().ravel()
@@ -0,0 +1,285 @@
+"""
+On-disk vector index for top-K retrieval over stored embeddings.
+
+Vectors are L2-normalised float32 rows kept in a NumPy memory-mapped matrix,
+so a query is a dot product against the whole pool (exact search). Pools of at
+least `ivf_min_size` vectors also get an IVF coarse quantizer (spherical
+k-means centroids): a query only scores the rows of its `nprobe` nearest
+clusters. Each write produces a new versioned set of files and swaps
+meta.json last, so readers in other processes never see a half-written index.
+
+Writers (add/remove/rebuild) hold an exclusive lock on index.lock in the
+directory from load to the meta.json swap, so concurrent writers in other
+processes cannot drop each other's rows. Version files meta.json no longer
+references are swept after each write. The k-means centroids are kept
+across add/remove (new rows are assigned to the nearest existing centroid)
+and only retrained once the pool has doubled since they were trained.
+"""
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, writers are not serialised
+    fcntl = None
+
+_VERSION_FILE = re.compile(r'^(?:(?:ids|vectors|centroids|assignments)-(.+)\.npy|meta-(.+)\.json)$')
+
+
+def stored_model_name(directory):
+    """The encoder key the index in directory was built with, or None if there is none."""
+    try:
+        with open(os.path.join(str(directory), 'meta.json')) as fh:
+            return json.load(fh).get('model_name')
+    except FileNotFoundError:
+        return None
+
+
+class VectorIndex:
+    def __init__(self, directory, model_name, ivf_min_size=20000, nprobe=8):
+        self.directory = str(directory)
+        self.model_name = model_name
+        self.ivf_min_size = ivf_min_size
+        self.nprobe = nprobe
+        self._reset()
+
+    def _reset(self):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.vectors = None
+        self.centroids = None
+        self.assignments = None
+        self.trained_size = 0
+        self.version = None
+
+    @property
+    def size(self):
+        return len(self.ids)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive writer lock, held across processes until the new meta.json is in place."""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path('index.lock'), 'a') as fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def load(self):
+        """(Re)loads the index from disk if it changed. Returns False when there is no usable index."""
+        for attempt in range(3):
+            try:
+                return self._load()
+            except FileNotFoundError:
+                # A writer swept this version between our meta.json read and the loads: re-read
+                if attempt == 2:
+                    raise
+
+    def _load(self):
+        try:
+            with open(self._path('meta.json')) as fh:
+                meta = json.load(fh)
+        except FileNotFoundError:
+            self._reset()
+            return False
+        if meta.get('model_name') != self.model_name:
+            # Built with another encoder: vectors are not comparable
+            self._reset()
+            return False
+
+        version = meta['version']
+        if version == self.version:
+            return True
+        ids = np.load(self._path(f'ids-{version}.npy'))
+        vectors = np.load(self._path(f'vectors-{version}.npy'), mmap_mode='r')
+        centroids = assignments = None
+        if meta.get('ivf'):
+            centroids = np.load(self._path(f'centroids-{version}.npy'))
+            assignments = np.load(self._path(f'assignments-{version}.npy'))
+        self.ids, self.vectors = ids, vectors
+        self.centroids, self.assignments = centroids, assignments
+        self.trained_size = meta.get('trained_size', len(ids))
+        self.version = version
+        return True
+
+    def add(self, ids, vectors):
+        """Adds (or replaces) rows for the given ids."""
+        ids = np.asarray(list(ids), dtype=np.int64)
+        if not len(ids):
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._locked():
+            self.load()
+            keep = ~np.isin(self.ids, ids)
+            assignments = None
+            if self.centroids is not None:
+                assignments = np.concatenate([self.assignments[keep], _assign(vectors, self.centroids)])
+            self._write(
+                np.concatenate([self.ids[keep], ids]), [(self.vectors, keep), (vectors, None)],
+                vectors.shape[1], assignments,
+            )
+
+    def remove(self, ids):
+        with self._locked():
+            self.load()
+            if not self.size:
+                return
+            keep = ~np.isin(self.ids, np.asarray(list(ids), dtype=np.int64))
+            if keep.all():
+                return
+            assignments = self.assignments[keep] if self.centroids is not None else None
+            self._write(self.ids[keep], [(self.vectors, keep)], self.vectors.shape[1], assignments)
+
+    def rebuild(self, ids, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._locked():
+            self.load()
+            # Forces a retrain: the old centroids may not fit the new pool
+            self.centroids = None
+            self._write(
+                np.asarray(list(ids), dtype=np.int64), [(vectors, None)],
+                vectors.shape[1] if vectors.ndim == 2 else 0,
+            )
+
+    def similarities(self, query):
+        """Returns (ids, similarities) for every row: one exact matrix-vector product."""
+        self.load()
+        if not self.size:
+            return self.ids, np.empty(0, dtype=np.float32)
+        query = np.asarray(query, dtype=np.float32).ravel()
+        return self.ids, np.asarray(self.vectors @ query)
+
+    def search(self, query, k):
+        """Returns up to k (id, similarity) pairs, best first. Similarity is the cosine in [-1, 1]."""
+        self.load()
+        if not self.size or k <= 0:
+            return []
+        query = np.asarray(query, dtype=np.float32).ravel()
+
+        rows = None
+        if self.centroids is not None:
+            nprobe = min(self.nprobe, len(self.centroids))
+            probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+            rows = np.flatnonzero(np.isin(self.assignments, probe))
+            if len(rows) < k:
+                rows = None  # Too few candidates in the probed clusters: fall back to exact
+
+        if rows is None:
+            scores = np.asarray(self.vectors @ query)
+            candidate_ids = self.ids
+        else:
+            scores = np.asarray(self.vectors[rows] @ query)
+            candidate_ids = self.ids[rows]
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(candidate_ids[i]), float(scores[i])) for i in top]
+
+    def _write(self, ids, sources, dim, assignments=None):
+        """
+        Writes a new version from `sources`, (matrix, row mask or None) pairs
+        copied in order, then swaps meta.json and sweeps older versions. Call
+        with the lock held. `assignments` are the rows' clusters under the
+        current centroids, reused unless the pool has doubled since training.
+        """
+        version = f"{time.time_ns()}-{os.getpid()}"
+
+        np.save(self._path(f'ids-{version}.npy'), ids)
+        vectors = np.lib.format.open_memmap(
+            self._path(f'vectors-{version}.npy'), mode='w+', dtype=np.float32,
+            shape=(len(ids), dim),
+        )
+        offset = 0
+        for source, mask in sources:
+            offset = _copy_rows(vectors, offset, source, mask)
+        vectors.flush()
+
+        ivf = len(ids) >= self.ivf_min_size
+        trained_size = self.trained_size
+        if ivf:
+            centroids = self.centroids
+            if centroids is None or assignments is None or len(ids) >= 2 * self.trained_size:
+                centroids = _train_centroids(vectors, nlist=int(np.sqrt(len(ids))))
+                assignments = _assign(vectors, centroids)
+                trained_size = len(ids)
+            np.save(self._path(f'centroids-{version}.npy'), centroids)
+            np.save(self._path(f'assignments-{version}.npy'), assignments)
+        del vectors
+
+        meta = {
+            'model_name': self.model_name,
+            'version': version,
+            'count': int(len(ids)),
+            'dim': int(dim),
+            'ivf': ivf,
+            'trained_size': int(trained_size) if ivf else 0,
+        }
+        tmp_meta = self._path(f'meta-{version}.json')
+        with open(tmp_meta, 'w') as fh:
+            json.dump(meta, fh)
+        os.replace(tmp_meta, self._path('meta.json'))
+
+        self.load()
+        self._sweep(version)
+
+    def _sweep(self, current):
+        """Removes files of every version but `current`, including ones left by crashed writers."""
+        for name in os.listdir(self.directory):
+            match = _VERSION_FILE.match(name)
+            if match and (match.group(1) or match.group(2)) != current:
+                try:
+                    os.remove(self._path(name))
+                except OSError:
+                    # Already gone, or still mapped by another process (Windows)
+                    pass
+
+
+def _copy_rows(out, offset, source, mask=None, chunk_size=65536):
+    """Copies source rows (those where mask is True) into out from offset, chunk by chunk."""
+    if source is None:
+        return offset
+    for start in range(0, len(source), chunk_size):
+        block = np.asarray(source[start:start + chunk_size])
+        if mask is not None:
+            block = block[mask[start:start + chunk_size]]
+        out[offset:offset + len(block)] = block
+        offset += len(block)
+    return offset
+
+
+def _assign(vectors, centroids, chunk_size=65536):
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), chunk_size):
+        block = np.asarray(vectors[start:start + chunk_size])
+        assignments[start:start + chunk_size] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+def _train_centroids(vectors, nlist, iterations=10, sample_per_list=64, seed=0):
+    """Spherical k-means on a sample of the pool; centroids are L2-normalised."""
+    rng = np.random.default_rng(seed)
+    n = len(vectors)
+    sample_idx = np.sort(rng.choice(n, size=min(n, nlist * sample_per_list), replace=False))
+    sample = np.asarray(vectors[sample_idx])
+    centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(sample @ centroids.T, axis=1)
+        for c in range(nlist):
+            members = sample[assignments == c]
+            if len(members):
+                centroids[c] = members.mean(axis=0)
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        centroids /= np.maximum(norms, 1e-12)
+    return centroids.astype(np.float32)
@@ -143,3 +143,108 @@ LOGOUT_REDIRECT_URL = 'home'
 # Security
 ENCRYPTION_KEY = b'WA6lRA1Hh6uoDMJBOMWqJp6ByAZ3y1O7u_H1EwaPQwI='
 
+
+# AI engine
+# Mini-batch size used when encoding resumes with the sentence encoder
+ATS_EMBEDDING_BATCH_SIZE = int(os.environ.get('ATS_EMBEDDING_BATCH_SIZE', '32'))
+# Persistent embedding cache (ai_engine.embedding_cache); least recently used entries beyond the cap are evicted
+ATS_EMBEDDING_CACHE = os.environ.get('ATS_EMBEDDING_CACHE', 'True').lower() in ('true', '1', 'yes')
+ATS_EMBEDDING_CACHE_MAX_ENTRIES = int(os.environ.get('ATS_EMBEDDING_CACHE_MAX_ENTRIES', '50000'))
+# A cache hit refreshes the entry's last_used_at only if it is older than this many seconds (keeps reads read-only)
+ATS_EMBEDDING_CACHE_TOUCH_SECONDS = int(os.environ.get('ATS_EMBEDDING_CACHE_TOUCH_SECONDS', '3600'))
+# Long resumes: score overlapping word windows (chunks) and pool their similarities per resume
+# ('max' = best chunk, 'topk' = mean of the best TOP_K); chunk embeddings are cached like whole texts
+ATS_EMBEDDING_CHUNKING = os.environ.get('ATS_EMBEDDING_CHUNKING', 'False').lower() in ('true', '1', 'yes')
+ATS_CHUNK_WORDS = int(os.environ.get('ATS_CHUNK_WORDS', '160'))
+ATS_CHUNK_OVERLAP = int(os.environ.get('ATS_CHUNK_OVERLAP', '40'))
+ATS_CHUNK_MAX = int(os.environ.get('ATS_CHUNK_MAX', '16'))
+ATS_CHUNK_POOLING = os.environ.get('ATS_CHUNK_POOLING', 'max')
+ATS_CHUNK_TOP_K = int(os.environ.get('ATS_CHUNK_TOP_K', '3'))
+# TF-IDF fallback (ai_engine.tfidf) when sentence-transformers is unavailable: hashed feature count and
+# how many per-text sparse rows stay cached
+ATS_TFIDF_FEATURES = int(os.environ.get('ATS_TFIDF_FEATURES', str(2 ** 18)))
+ATS_TFIDF_CACHE_SIZE = int(os.environ.get('ATS_TFIDF_CACHE_SIZE', '20000'))
+# Vector index over stored resume embeddings (top-K search); IVF clustering kicks in for large pools
+ATS_VECTOR_INDEX_DIR = os.environ.get('ATS_VECTOR_INDEX_DIR', os.path.join(str(BASE_DIR), 'vector_index'))
+ATS_VECTOR_INDEX_IVF_MIN_SIZE = int(os.environ.get('ATS_VECTOR_INDEX_IVF_MIN_SIZE', '20000'))
+ATS_VECTOR_INDEX_NPROBE = int(os.environ.get('ATS_VECTOR_INDEX_NPROBE', '8'))
+# Sentence-encoder backend (ai_engine.encoders): 'torch' (reference), 'torch-int8' or 'onnx'
+# (ONNX_FILE selects e.g. a quantized export); THREADS caps inference threads per process (0 = library default).
+# Check a backend with `python manage.py check_encoder_parity` before switching.
+ATS_ENCODER_BACKEND = os.environ.get('ATS_ENCODER_BACKEND', 'torch')
+ATS_ENCODER_THREADS = int(os.environ.get('ATS_ENCODER_THREADS', '0'))
+ATS_ENCODER_ONNX_FILE = os.environ.get('ATS_ENCODER_ONNX_FILE', '')
+# Keyword extraction (screener.extract_keywords_many): nlp.pipe batch size and worker processes
+ATS_SPACY_BATCH_SIZE = int(os.environ.get('ATS_SPACY_BATCH_SIZE', '64'))
+ATS_SPACY_N_PROCESS = int(os.environ.get('ATS_SPACY_N_PROCESS', '1'))
+# Memoised keyword extraction (ai_engine.keyword_cache): in-process LRU size, database copy and its cap
+ATS_KEYWORD_CACHE_SIZE = int(os.environ.get('ATS_KEYWORD_CACHE_SIZE', '1024'))
+ATS_KEYWORD_CACHE_PERSISTENT = os.environ.get('ATS_KEYWORD_CACHE_PERSISTENT', 'True').lower() in ('true', '1', 'yes')
+ATS_KEYWORD_CACHE_MAX_ENTRIES = int(os.environ.get('ATS_KEYWORD_CACHE_MAX_ENTRIES', '20000'))
+# Load spaCy and the sentence encoder when the WSGI app starts (config/wsgi.py) instead of on the first request
+ATS_PRELOAD_MODELS = os.environ.get('ATS_PRELOAD_MODELS', 'True').lower() in ('true', '1', 'yes')
+# Optional shared inference daemon (`python manage.py run_inference_server`): when the socket path is set,
+# web workers send encode/keyword calls there instead of loading the models; unreachable -> in-process.
+# Concurrent requests are coalesced into batches of up to MAX_BATCH texts, waiting at most MAX_WAIT_MS.
+ATS_INFERENCE_SOCKET = os.environ.get('ATS_INFERENCE_SOCKET', '')
+ATS_INFERENCE_MAX_BATCH = int(os.environ.get('ATS_INFERENCE_MAX_BATCH', '64'))
+ATS_INFERENCE_MAX_WAIT_MS = float(os.environ.get('ATS_INFERENCE_MAX_WAIT_MS', '5'))
+
+# Background processing (resumes.tasks): 'thread' drains the DB-backed queue inside the web process,
+# 'worker' leaves it to `python manage.py run_worker`, 'sync' runs tasks inline in the request
+ATS_TASK_RUNNER = os.environ.get('ATS_TASK_RUNNER', 'thread')
+# A RUNNING task whose heartbeat (refreshed after every scan chunk) is older than this is requeued
+ATS_TASK_STALE_SECONDS = int(os.environ.get('ATS_TASK_STALE_SECONDS', '1800'))
+ATS_SCAN_CHUNK_SIZE = int(os.environ.get('ATS_SCAN_CHUNK_SIZE', '16'))
+
+# Parallel text extraction (ai_engine.parser.extract_many): worker processes (0 = one per CPU) and per-file timeout in seconds
+# The pool is kept for the life of the process; its workers are fresh interpreters (forkserver) that read these settings from the environment
+ATS_EXTRACTION_WORKERS = int(os.environ.get('ATS_EXTRACTION_WORKERS', '0'))
+ATS_EXTRACTION_TIMEOUT = float(os.environ.get('ATS_EXTRACTION_TIMEOUT', '60'))
+# Extraction results (text, or the failure) cached per file hash and parser version (ai_engine.extraction_cache)
+ATS_EXTRACTION_CACHE = os.environ.get('ATS_EXTRACTION_CACHE', 'True').lower() in ('true', '1', 'yes')
+
+# Stage timings as JSON log lines: per scan run at INFO, per resume / extracted file at DEBUG
+ATS_LOG_LEVEL = os.environ.get('ATS_LOG_LEVEL', 'INFO')
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'timing': {'format': '{asctime} {levelname} {name} {message}', 'style': '{'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'timing'},
+    },
+    'loggers': {
+        'resumes': {'handlers': ['console'], 'level': ATS_LOG_LEVEL, 'propagate': False},
+        'ai_engine': {'handlers': ['console'], 'level': ATS_LOG_LEVEL, 'propagate': False},
+    },
+}
+
+# PDF extraction (ai_engine.parser.extract_pdf): stop after this many pages / characters (0 = no limit);
+# layout analysis 'full' (pdfminer default), 'fast' (no text-box grouping) or 'none' (content-stream order)
+ATS_PDF_MAX_PAGES = int(os.environ.get('ATS_PDF_MAX_PAGES', '10'))
+ATS_PDF_MAX_CHARS = int(os.environ.get('ATS_PDF_MAX_CHARS', '50000'))
+ATS_PDF_LAYOUT = os.environ.get('ATS_PDF_LAYOUT', 'fast')
+
+# Scanned PDFs: when the text layer has fewer than ATS_OCR_MIN_CHARS_PER_PAGE characters per page,
+# the page images are OCR'd instead
+ATS_PDF_OCR = os.environ.get('ATS_PDF_OCR', 'True').lower() in ('true', '1', 'yes')
+ATS_OCR_MIN_CHARS_PER_PAGE = int(os.environ.get('ATS_OCR_MIN_CHARS_PER_PAGE', '25'))
+
+# OCR (ai_engine.ocr): tesseract binary and tessdata dir ('' = PATH / bundled tessdata), language,
+# page segmentation mode (3 = automatic, 4 = single column, 6 = single block), pool size (0 = one per CPU),
+# images per worker batch, long-side downscale limit in pixels (0 = off) and Otsu binarization
+ATS_TESSERACT_CMD = os.environ.get('ATS_TESSERACT_CMD', '')
+ATS_TESSDATA_DIR = os.environ.get('ATS_TESSDATA_DIR', '')
+ATS_OCR_LANG = os.environ.get('ATS_OCR_LANG', 'eng')
+ATS_OCR_PSM = int(os.environ.get('ATS_OCR_PSM', '3'))
+ATS_OCR_WORKERS = int(os.environ.get('ATS_OCR_WORKERS', '0'))
+ATS_OCR_BATCH_SIZE = int(os.environ.get('ATS_OCR_BATCH_SIZE', '8'))
+ATS_OCR_MAX_SIDE = int(os.environ.get('ATS_OCR_MAX_SIDE', '3000'))
+ATS_OCR_BINARIZE = os.environ.get('ATS_OCR_BINARIZE', 'False').lower() in ('true', '1', 'yes')
+
+# ZIP resume archives (resumes.uploads): limits on resume count and on actually decompressed bytes
+ATS_ZIP_MAX_MEMBERS = int(os.environ.get('ATS_ZIP_MAX_MEMBERS', '2000'))
+ATS_ZIP_MAX_TOTAL_BYTES = int(os.environ.get('ATS_ZIP_MAX_TOTAL_BYTES', str(500 * 1024 * 1024)))
+ATS_ZIP_MAX_MEMBER_BYTES = int(os.environ.get('ATS_ZIP_MAX_MEMBER_BYTES', str(20 * 1024 * 1024)))
@@ -14,3 +14,12 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# Load the NLP models at startup rather than on the first request. With gunicorn's
+# preload_app (see gunicorn.conf.py) this runs once in the master process.
+from django.conf import settings  # noqa: E402
+
+if settings.ATS_PRELOAD_MODELS:
+    from ai_engine import screener  # noqa: E402
+
+    screener.preload_models()
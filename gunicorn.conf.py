@@ -0,0 +1,30 @@
+"""
+Gunicorn settings (picked up automatically from the working directory).
+
+The app, and with it the NLP models (config/wsgi.py), is loaded once in the
+master and shared copy-on-write with the forked workers. Each worker then
+runs a warm-up inference before it accepts requests. Inference is kept out
+of the master so no torch/OpenMP thread pool exists at fork time.
+"""
+import gc
+
+preload_app = True
+
+
+def when_ready(server):
+    # Move everything loaded so far out of the GC's reach: collections in the
+    # workers would otherwise touch (and so copy) the shared pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from django.conf import settings
+
+    if settings.ATS_PRELOAD_MODELS:
+        from ai_engine import screener
+
+        try:
+            screener.warm_up()
+        except Exception as e:
+            # A failed warm-up only costs the first request its latency
+            print(f"Model warm-up failed in worker {worker.pid}: {e}")
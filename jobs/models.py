@@ -16,5 +16,15 @@ class JobRequirement(models.Model):
     is_template = models.BooleanField(default=False, help_text="Save as reusable template")
     file = models.FileField(upload_to='jds/', blank=True, null=True, help_text="Original JD file")
     
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'description' in update_fields:
+            # Memoised per description, so re-saving an unchanged JD never reaches spaCy
+            from ai_engine.screener import extract_keywords
+            self.keywords = extract_keywords(self.description)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'keywords'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.title} ({'Template' if self.is_template else 'Job'})"
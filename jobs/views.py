@@ -1,5 +1,6 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
+from resumes import tasks
 from .models import JobRequirement
 from .forms import JobRequirementForm
 
@@ -12,7 +13,9 @@ def job_create(request):
     if request.method == 'POST':
         form = JobRequirementForm(request.POST, request.FILES)
         if form.is_valid():
-            form.save()
+            job = form.save()
+            # Stored resumes get scored against the new job in the background
+            tasks.enqueue('SCORE_JOB', job_id=job.pk)
             return redirect('job_list')
     else:
         form = JobRequirementForm()
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Resume, ResumeScore, CandidateProfile, ProfileVersion, SubmissionActivity
+from .models import Resume, ResumeScore, CandidateProfile, ProfileVersion, SubmissionActivity, BackgroundTask
 
 admin.site.register(Resume)
 admin.site.register(ResumeScore)
@@ -19,3 +19,8 @@ class SubmissionActivityAdmin(admin.ModelAdmin):
     list_display = ('profile', 'actor', 'action', 'timestamp')
     list_filter = ('action', 'timestamp')
 
+
+@admin.register(BackgroundTask)
+class BackgroundTaskAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'status', 'attempts', 'created_at', 'started_at', 'heartbeat_at', 'finished_at')
+    list_filter = ('kind', 'status')
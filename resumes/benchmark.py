@@ -0,0 +1,180 @@
+"""
+Synthetic workload for `python manage.py benchmark_pipeline`.
+
+Resume and JD corpora are generated from a seeded random.Random, so a given
+(size, seed) produces the same texts on every machine and every commit.
+Resume files (text PDF, DOCX, PNG) are generated the same way for the
+extraction stage. StageTimer records wall time per stage; the command runs
+the stages against a throwaway database and prints the timings as JSON.
+"""
+import os
+import random
+import time
+from contextlib import contextmanager
+
+SKILLS = [
+    'Python', 'Django', 'Flask', 'FastAPI', 'Java', 'Spring', 'Kotlin', 'JavaScript', 'TypeScript',
+    'React', 'Angular', 'Vue', 'Node.js', 'Go', 'Rust', 'C++', 'C#', '.NET', 'SQL', 'PostgreSQL',
+    'MySQL', 'MongoDB', 'Redis', 'Kafka', 'RabbitMQ', 'Docker', 'Kubernetes', 'Terraform', 'AWS',
+    'Azure', 'GCP', 'Linux', 'Git', 'CI/CD', 'Jenkins', 'Pandas', 'NumPy', 'Spark', 'Airflow',
+    'TensorFlow', 'PyTorch', 'Scikit-learn', 'Tableau', 'Power BI', 'Excel', 'Salesforce', 'SAP',
+    'Agile', 'Scrum', 'JIRA', 'REST', 'GraphQL', 'Microservices', 'HTML', 'CSS', 'Selenium',
+]
+TITLES = [
+    'Software Engineer', 'Backend Developer', 'Frontend Developer', 'Full Stack Developer',
+    'Data Engineer', 'Data Scientist', 'DevOps Engineer', 'QA Engineer', 'Project Manager',
+    'Business Analyst', 'Machine Learning Engineer', 'Cloud Architect', 'Product Manager',
+]
+CERTIFICATIONS = [
+    'AWS Certified Solutions Architect', 'PMP', 'CISSP', 'Certified Kubernetes Administrator',
+    'Scrum Master', 'Azure Fundamentals', 'ITIL', 'CompTIA Security+', 'Google Cloud Professional',
+]
+DEGREES = ['B.Tech in Computer Science', 'B.Sc in Mathematics', 'M.Sc in Data Science', 'MBA', 'B.E. in Electronics']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Systems', 'Stark Industries', 'Wayne Tech', 'Hooli', 'Vandelay']
+FIRST_NAMES = ['Asha', 'Ravi', 'Maria', 'John', 'Wei', 'Fatima', 'Carlos', 'Priya', 'Liam', 'Sara', 'Noah', 'Aiko']
+LAST_NAMES = ['Patel', 'Smith', 'Garcia', 'Chen', 'Khan', 'Okafor', 'Novak', 'Silva', 'Kim', 'Iyer', 'Brown']
+DUTIES = [
+    'Designed and built {skill} services handling millions of requests per day.',
+    'Led a team of {n} engineers delivering {skill} features on schedule.',
+    'Migrated legacy systems to {skill}, cutting infrastructure costs by {n}0%.',
+    'Managed stakeholder communication and reporting for {skill} projects.',
+    'Automated testing and deployment pipelines with {skill}.',
+    'Mentored junior developers and reviewed {skill} code.',
+    'Analysed production incidents and improved {skill} monitoring.',
+    'Collaborated with product teams to define {skill} requirements.',
+]
+RISK_LINES = [
+    'Career break between 2019 and 2021.',
+    'Open to relocation; requires visa sponsorship.',
+    'Freelance consultant on short-term contracts.',
+]
+
+
+def synthetic_jd(rng):
+    title = rng.choice(TITLES)
+    skills = rng.sample(SKILLS, rng.randint(5, 9))
+    years = rng.randint(2, 8)
+    lines = [
+        f"We are hiring a {title} to join our growing team.",
+        f"Required: {years}+ years of experience with {', '.join(skills[:-2])}.",
+        f"Nice to have: {skills[-2]} and {skills[-1]}.",
+        f"Preferred certification: {rng.choice(CERTIFICATIONS)}.",
+        "You will design, build and operate production systems, work with stakeholders "
+        "and mentor other engineers. Background check and a notice period of at most 30 days required.",
+    ]
+    return "\n".join(lines)
+
+
+def synthetic_resume(rng):
+    """Returns (candidate name, resume text); lengths vary from a short CV to a multi-page one."""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    skills = rng.sample(SKILLS, rng.randint(4, 14))
+    years = rng.randint(0, 15)
+    lines = [
+        name,
+        f"{name.lower().replace(' ', '.')}@example.com | +1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+        f"{rng.choice(TITLES)} with {years} years of experience.",
+        "Skills: " + ", ".join(skills),
+        f"Education: {rng.choice(DEGREES)}",
+    ]
+    if rng.random() < 0.4:
+        lines.append("Certifications: " + ", ".join(rng.sample(CERTIFICATIONS, rng.randint(1, 3))))
+    for _ in range(rng.randint(1, 5)):
+        lines.append(f"{rng.choice(TITLES)} at {rng.choice(COMPANIES)} ({rng.randint(2005, 2020)} - {rng.randint(2021, 2025)})")
+        for _ in range(rng.randint(2, 12)):
+            lines.append(rng.choice(DUTIES).format(skill=rng.choice(skills), n=rng.randint(2, 9)))
+    if rng.random() < 0.15:
+        lines.append(rng.choice(RISK_LINES))
+    return name, "\n".join(lines)
+
+
+def make_corpus(size, seed=0):
+    """(jd_text, [(candidate name, resume text)] * size) for a seed."""
+    rng = random.Random(f"{seed}-{size}")
+    return synthetic_jd(rng), [synthetic_resume(rng) for _ in range(size)]
+
+
+def write_pdf(path, lines):
+    """Minimal text PDF (Helvetica, one page per 60 lines); no PDF library needed."""
+    pages = [lines[i:i + 60] for i in range(0, len(lines), 60)] or [[]]
+    objects = [b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>", b""]
+    kids = []
+    for page_lines in pages:
+        escaped = [line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') for line in page_lines]
+        stream = ("BT /F1 10 Tf 50 780 Td 12 TL " + " ".join(f"({line}) '" for line in escaped) + " ET").encode('latin-1', 'replace')
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 1 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % k for k in kids) + b"] /Count %d >>" % len(kids)
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, len(objects), xref)
+    with open(path, 'wb') as fh:
+        fh.write(bytes(out))
+
+
+def write_docx(path, lines):
+    import docx
+
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    document.save(path)
+
+
+def write_png(path, lines):
+    """A photographed-page stand-in: black text on an off-white, phone-sized canvas."""
+    from PIL import Image, ImageDraw
+
+    image = Image.new('RGB', (2480, 3508), (245, 244, 240))
+    draw = ImageDraw.Draw(image)
+    for i, line in enumerate(lines[:80]):
+        draw.text((120, 120 + i * 40), line, fill=(20, 20, 20))
+    image.save(path)
+
+
+FILE_WRITERS = {'pdf': write_pdf, 'docx': write_docx, 'png': write_png}
+
+
+def make_files(directory, count, seed=0, kinds=('pdf', 'docx', 'png')):
+    """Writes `count` synthetic resumes per file kind into directory. Returns {kind: [paths]}."""
+    rng = random.Random(f"{seed}-files")
+    files = {}
+    for kind in kinds:
+        files[kind] = []
+        for i in range(count):
+            _, text = synthetic_resume(rng)
+            path = os.path.join(directory, f"resume_{i:05d}.{kind}")
+            FILE_WRITERS[kind](path, text.splitlines())
+            files[kind].append(path)
+    return files
+
+
+class StageTimer:
+    """Collects {stage: {seconds, items, per_item_ms, items_per_second}} in the order stages ran."""
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name, items):
+        started = time.perf_counter()
+        yield
+        seconds = time.perf_counter() - started
+        self.stages[name] = {
+            'seconds': round(seconds, 4),
+            'items': items,
+            'per_item_ms': round(seconds * 1000 / items, 3) if items else None,
+            'items_per_second': round(items / seconds, 1) if seconds and items else None,
+        }
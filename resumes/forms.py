@@ -99,3 +99,25 @@ class MatchStoredForm(forms.Form):
         super().__init__(*args, **kwargs)
         self.fields['resumes'].queryset = Resume.objects.all().order_by('-uploaded_at')
 
+
+
+class SearchStoredForm(forms.Form):
+    """Search the whole stored pool: paste JD, get the top-K resumes by semantic score, then run QA on them."""
+    job_description = forms.CharField(
+        label="Job Description",
+        widget=forms.Textarea(
+            attrs={
+                "rows": 5,
+                "placeholder": "Paste the job description. The best matching stored resumes will be shortlisted automatically.",
+                "class": "form-control bg-card-bg text-white",
+                "style": "resize: vertical;",
+            }
+        ),
+    )
+    top_k = forms.IntegerField(
+        label="Shortlist size",
+        initial=50,
+        min_value=1,
+        max_value=500,
+        widget=forms.NumberInput(attrs={"class": "form-control bg-card-bg text-white", "style": "max-width: 8rem;"}),
+    )
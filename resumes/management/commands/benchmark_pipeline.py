@@ -0,0 +1,174 @@
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from ai_engine import screener
+from ai_engine.keyword_cache import keyword_pipeline_version
+from ai_engine.parser import extract_many
+from resumes.benchmark import StageTimer, make_corpus, make_files
+from resumes.models import Resume, ScanResult, ScanRun
+from resumes.pipeline import JDProfile, build_scan_result
+
+
+class Command(BaseCommand):
+    help = (
+        "Time each screening stage (extraction, keywords, embedding, QA rules, DB writes, "
+        "rendering) on synthetic corpora and print the timings as JSON. Runs against a "
+        "throwaway database; offline by default (TF-IDF fallback)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,1000,50000', help="Comma-separated corpus sizes.")
+        parser.add_argument('--files', type=int, default=20, help="Synthetic files per type (PDF, DOCX, PNG) for the extraction stage; 0 skips it.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--workers', type=int, default=None, help="Extraction worker processes (default: ATS_EXTRACTION_WORKERS).")
+        parser.add_argument(
+            '--encoder', choices=['fallback', 'configured'], default='fallback',
+            help="'fallback' forces the TF-IDF scorer (no model download); 'configured' uses the settings.",
+        )
+        parser.add_argument('--output', help="Write the JSON report to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        except ValueError:
+            raise CommandError(f"--sizes must be comma-separated integers, got {options['sizes']!r}")
+
+        # Pipeline progress prints go to stderr; stdout carries only the JSON report
+        with tempfile.TemporaryDirectory(prefix='ats-bench-') as tmp, contextlib.redirect_stdout(sys.stderr):
+            old_name = self._setup_database(tmp)
+            try:
+                if options['encoder'] == 'fallback':
+                    screener.use_fallback_model()
+                # Model loading is not part of any stage
+                screener.warm_up()
+                report = {'meta': self._meta(options), 'extraction': None, 'corpora': []}
+                if options['files']:
+                    report['extraction'] = self._bench_extraction(tmp, options)
+                for size in sizes:
+                    self.stderr.write(f"Benchmarking a corpus of {size} resume(s)...")
+                    report['corpora'].append(self._bench_corpus(size, options))
+            finally:
+                self._teardown_database(old_name)
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output + "\n")
+            self.stderr.write(f"Wrote {options['output']}")
+        else:
+            self.stdout.write(output)
+
+    def _setup_database(self, tmp):
+        """A fresh, migrated SQLite file (file-backed, so DB writes include real commits)."""
+        setup_test_environment()
+        settings.DATABASES[connection.alias].setdefault('TEST', {})['NAME'] = os.path.join(tmp, 'bench.sqlite3')
+        return connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+    def _teardown_database(self, old_name):
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    def _meta(self, options):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, timeout=10,
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            commit = None
+        return {
+            'commit': commit,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': sys.version.split()[0],
+            'django': django.get_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'seed': options['seed'],
+            'encoder': 'tfidf-fallback' if screener.is_fallback() else f"{screener.EMBEDDING_MODEL_NAME} ({settings.ATS_ENCODER_BACKEND})",
+            'keyword_pipeline': keyword_pipeline_version(),
+            'extraction_workers': options['workers'] or settings.ATS_EXTRACTION_WORKERS or os.cpu_count(),
+        }
+
+    def _bench_extraction(self, tmp, options):
+        from ai_engine.ocr import ocr_config
+
+        directory = os.path.join(tmp, 'files')
+        os.makedirs(directory)
+        ocr_available = bool(ocr_config().cmd and (os.path.exists(ocr_config().cmd) or ocr_config().engine == 'tesserocr'))
+        kinds = ('pdf', 'docx', 'png') if ocr_available else ('pdf', 'docx')
+        files = make_files(directory, options['files'], seed=options['seed'], kinds=kinds)
+        workers = options['workers'] or settings.ATS_EXTRACTION_WORKERS or None
+
+        timer = StageTimer()
+        errors = {}
+        for kind, paths in files.items():
+            with timer.stage(kind, len(paths)):
+                results = list(extract_many(paths, workers=workers, timeout=settings.ATS_EXTRACTION_TIMEOUT))
+            errors[kind] = sum(1 for r in results if r.error or not r.text)
+        for kind, count in errors.items():
+            timer.stages[kind]['empty_or_failed'] = count
+        if not ocr_available:
+            timer.stages['png'] = {'skipped': 'tesseract not available'}
+        return timer.stages
+
+    def _bench_corpus(self, size, options):
+        if options['encoder'] == 'fallback':
+            # Fresh IDF table and row cache per corpus: sizes don't warm each other up
+            screener.use_fallback_model()
+        jd_text, corpus = make_corpus(size, seed=options['seed'])
+        texts = [text for _, text in corpus]
+        user, _ = User.objects.get_or_create(username='benchmark')
+        scan_run = ScanRun.objects.create(created_by=user, jd_text=jd_text, status='DONE', total_resumes=size)
+        timer = StageTimer()
+
+        with timer.stage('jd_profile', 1):
+            profile = JDProfile(jd_text)
+            profile.embedding
+        with timer.stage('keywords', size):
+            screener.extract_keywords_many(texts, use_cache=False)
+        with timer.stage('semantic', size):
+            semantic_scores = profile.score(texts)
+
+        resumes = [Resume(candidate_name=name, parsed_content=text) for name, text in corpus]
+        with timer.stage('qa_rules', size):
+            results = [
+                build_scan_result(scan_run, resume, profile, semantic_score=score, reparse=False)
+                for resume, score in zip(resumes, semantic_scores)
+            ]
+        with timer.stage('db_writes', size):
+            chunk_size = 500
+            for start in range(0, size, chunk_size):
+                with transaction.atomic():
+                    Resume.objects.bulk_create(resumes[start:start + chunk_size])
+                    ScanResult.objects.bulk_create(results[start:start + chunk_size])
+            ScanRun.objects.filter(pk=scan_run.pk).update(processed_resumes=size)
+
+        client = Client()
+        client.force_login(user)
+        with timer.stage('rendering', size):
+            response = client.get(reverse('filter_results', args=[scan_run.pk]))
+        if response.status_code != 200:
+            raise CommandError(f"filter_results returned HTTP {response.status_code}")
+
+        total = sum(stage['seconds'] for stage in timer.stages.values())
+        return {
+            'size': size,
+            'total_seconds': round(total, 4),
+            'resumes_per_second': round(size / total, 1) if total else None,
+            'stages': timer.stages,
+        }
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from ai_engine import screener
+from resumes.search import get_resume_index, sync_resume_index
+
+
+class Command(BaseCommand):
+    help = "Encode stored resumes into the vector index used by 'Search all stored resumes'."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Rebuild from scratch instead of syncing new/deleted resumes.")
+
+    def handle(self, *args, **options):
+        if screener.is_fallback():
+            self.stderr.write("Sentence encoder unavailable (TF-IDF fallback); nothing to index.")
+            return
+        index = get_resume_index()
+        encoded = sync_resume_index(index, rebuild=options['full'])
+        self.stdout.write(self.style.SUCCESS(f"Index holds {index.size} resumes ({encoded} encoded)."))
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from resumes import tasks
+
+
+class Command(BaseCommand):
+    help = "Process queued background tasks (scan runs, bulk uploads, resume scoring)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Drain the queue once and exit.")
+        parser.add_argument('--poll', type=float, default=2.0, help="Seconds to wait between polls when the queue is empty.")
+
+    def handle(self, *args, **options):
+        self.stdout.write("Worker started; waiting for tasks.")
+        while True:
+            processed = tasks.drain()
+            if processed:
+                self.stdout.write(f"Processed {processed} task(s).")
+            if options['once']:
+                break
+            time.sleep(options['poll'])
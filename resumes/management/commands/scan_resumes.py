@@ -0,0 +1,159 @@
+import os
+import time
+
+from django.contrib.auth.models import User
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from resumes.models import BackgroundTask, ScanResult, ScanRun
+from resumes.pipeline import JDProfile, add_stage_seconds, log_scan_run_timings, run_qa_for_resumes
+from resumes.uploads import is_allowed_resume_file, store_uploaded_resume
+
+
+def iter_resume_files(directory):
+    """Supported resume files under directory, in a stable (sorted) order."""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if is_allowed_resume_file(name):
+                yield os.path.join(root, name)
+
+
+class Command(BaseCommand):
+    help = (
+        "Scan a directory of resumes against a job description without the web UI. "
+        "Results are saved as a ScanRun after every chunk, so an interrupted scan "
+        "restarts where it stopped. Each new file is copied into MEDIA_ROOT as a stored "
+        "resume (identical files are stored once), like an upload."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jd', required=True, help="Text file with the job description.")
+        parser.add_argument('--dir', required=True, help="Directory scanned recursively for PDF/DOCX/PNG/JPG resumes.")
+        parser.add_argument('--workers', type=int, default=None, help="Extraction worker processes (default: ATS_EXTRACTION_WORKERS).")
+        parser.add_argument('--chunk-size', type=int, default=256, help="Resumes per extraction batch and checkpoint.")
+        parser.add_argument('--user', help="Username owning the scan run (default: the first superuser).")
+        parser.add_argument('--run', type=int, help="Resume this scan run instead of the latest unfinished one for the same JD.")
+        parser.add_argument('--new', action='store_true', help="Always start a new scan run.")
+
+    def handle(self, *args, **options):
+        if not os.path.isdir(options['dir']):
+            raise CommandError(f"Not a directory: {options['dir']}")
+        try:
+            with open(options['jd'], encoding='utf-8') as fh:
+                jd_text = fh.read().strip()
+        except OSError as e:
+            raise CommandError(f"Cannot read job description: {e}")
+        if not jd_text:
+            raise CommandError("The job description file is empty.")
+
+        user = self._user(options['user'])
+        paths = list(iter_resume_files(options['dir']))
+        scan_run = self._scan_run(user, jd_text, options)
+        # Checkpoint: resumes that already have a result in this run are not scanned again, and
+        # files they were read from are skipped without being read, hashed or copied again
+        done_ids = set(scan_run.results.values_list('resume_id', flat=True))
+        done_paths = set(scan_run.results.exclude(source_path='').values_list('source_path', flat=True))
+        if done_ids:
+            self.stdout.write(f"Resuming scan run {scan_run.pk}: {len(done_ids)} resume(s) already scanned.")
+        else:
+            self.stdout.write(f"Scan run {scan_run.pk}: {len(paths)} file(s) in {options['dir']}.")
+
+        scan_run.status = 'RUNNING'
+        scan_run.total_resumes = len(paths)
+        scan_run.error = ''
+        scan_run.save(update_fields=['status', 'total_resumes', 'error'])
+
+        jd_started = time.perf_counter()
+        jd_profile = JDProfile(jd_text)
+        # Continues the totals of a resumed run
+        stage_seconds = add_stage_seconds(dict(scan_run.stage_seconds or {}), {'jd': time.perf_counter() - jd_started})
+        chunk_size = max(1, options['chunk_size'])
+        started = time.perf_counter()
+        scanned = skipped = unreadable = 0
+        try:
+            for start in range(0, len(paths), chunk_size):
+                resumes = []
+                source_paths = []
+                for path in paths[start:start + chunk_size]:
+                    if path in done_paths:
+                        skipped += 1
+                        continue
+                    try:
+                        with open(path, 'rb') as fh:
+                            resume, _ = store_uploaded_resume(File(fh, name=os.path.basename(path)))
+                    except OSError as e:
+                        self.stderr.write(f"Skipping {path}: {e}")
+                        unreadable += 1
+                        continue
+                    # Finished before a restart, or the same file twice in the directory
+                    if resume.pk in done_ids:
+                        skipped += 1
+                        continue
+                    done_ids.add(resume.pk)
+                    resumes.append(resume)
+                    source_paths.append(path)
+                if resumes:
+                    add_stage_seconds(stage_seconds, run_qa_for_resumes(
+                        scan_run, resumes, jd_profile, workers=options['workers'], source_paths=source_paths,
+                    ))
+                    scanned += len(resumes)
+                # Unreadable files are not processed; a later run retries them
+                ScanRun.objects.filter(pk=scan_run.pk).update(
+                    processed_resumes=scanned + skipped, stage_seconds=stage_seconds,
+                )
+
+                elapsed = time.perf_counter() - started
+                rate = scanned / elapsed if elapsed else 0.0
+                remaining = len(paths) - min(start + chunk_size, len(paths))
+                eta = f", ETA {remaining / rate / 60:.1f} min" if rate and remaining else ""
+                self.stdout.write(
+                    f"  {min(start + chunk_size, len(paths))}/{len(paths)} files, "
+                    f"{scanned} scanned at {rate:.1f} resumes/s{eta}"
+                )
+        except BaseException as e:
+            ScanRun.objects.filter(pk=scan_run.pk).update(
+                status='FAILED', error=str(e) or type(e).__name__, finished_at=timezone.now(),
+            )
+            self.stderr.write(f"Scan run {scan_run.pk} stopped; run the command again to continue.")
+            raise
+
+        ScanRun.objects.filter(pk=scan_run.pk).update(status='DONE', finished_at=timezone.now())
+        log_scan_run_timings(scan_run, stage_seconds)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Scan run {scan_run.pk} done: {scanned} resume(s) scanned in {elapsed:.1f}s "
+            f"({scanned / elapsed if elapsed else 0.0:.1f} resumes/s), {skipped} already scanned, "
+            f"{unreadable} unreadable. {ScanResult.objects.filter(scan_run=scan_run).count()} results stored."
+        ))
+        self.stdout.write("Seconds per stage: " + ", ".join(
+            f"{stage} {seconds:.2f}" for stage, seconds in stage_seconds.items()
+        ))
+
+    def _user(self, username):
+        if username:
+            user = User.objects.filter(username=username).first()
+            if user is None:
+                raise CommandError(f"No user named {username!r}.")
+            return user
+        user = User.objects.filter(is_superuser=True).order_by('pk').first()
+        if user is None:
+            raise CommandError("No superuser exists; pass --user.")
+        return user
+
+    def _scan_run(self, user, jd_text, options):
+        if options['run']:
+            scan_run = ScanRun.objects.filter(pk=options['run']).first()
+            if scan_run is None:
+                raise CommandError(f"Scan run {options['run']} does not exist.")
+            if scan_run.jd_text != jd_text:
+                raise CommandError(f"Scan run {scan_run.pk} was started with a different job description.")
+            return scan_run
+        if not options['new']:
+            unfinished = ScanRun.objects.filter(created_by=user, jd_text=jd_text).exclude(status='DONE')
+            for scan_run in unfinished.order_by('-created_at')[:10]:
+                # Runs started from the web UI belong to the background queue
+                if not BackgroundTask.objects.filter(kind='SCAN_RUN', payload__scan_run_id=scan_run.pk).exists():
+                    return scan_run
+        return ScanRun.objects.create(created_by=user, jd_text=jd_text)
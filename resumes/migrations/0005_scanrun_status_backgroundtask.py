@@ -0,0 +1,62 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0004_add_scan_run_scan_result'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scanrun',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='scanrun',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='scanrun',
+            name='processed_resumes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        # Runs created before background processing existed are complete
+        migrations.AddField(
+            model_name='scanrun',
+            name='status',
+            field=models.CharField(choices=[('QUEUED', 'Queued'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='DONE', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='scanrun',
+            name='status',
+            field=models.CharField(choices=[('QUEUED', 'Queued'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='QUEUED', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='scanrun',
+            name='total_resumes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='BackgroundTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('SCAN_RUN', 'Scan run'), ('SCORE_RESUME', 'Score resume against all jobs'), ('BULK_UPLOAD', 'Parse bulk upload')], max_length=20)),
+                ('payload', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='resumes_bac_status_d37091_idx')],
+            },
+        ),
+    ]
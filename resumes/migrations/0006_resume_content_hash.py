@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:43
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def backfill_content_hash(apps, schema_editor):
+    Resume = apps.get_model('resumes', 'Resume')
+    for resume in Resume.objects.filter(content_hash='').exclude(file='').iterator():
+        try:
+            digest = hashlib.sha256()
+            with resume.file.open('rb') as fh:
+                for chunk in iter(lambda: fh.read(1024 * 1024), b''):
+                    digest.update(chunk)
+        except OSError:
+            # File missing from media storage; leave it unhashed
+            continue
+        resume.content_hash = digest.hexdigest()
+        resume.save(update_fields=['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0005_scanrun_status_backgroundtask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='SHA-256 of the uploaded file', max_length=64),
+        ),
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0007_backgroundtask_score_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='parsed_with_ocr',
+            field=models.BooleanField(default=False, help_text='parsed_content was recovered by OCR (image or scanned PDF)'),
+        ),
+    ]
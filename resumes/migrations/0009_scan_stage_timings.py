@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0008_resume_parsed_with_ocr'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scanresult',
+            name='timings',
+            field=models.JSONField(blank=True, default=dict, help_text='Seconds spent on this resume per stage'),
+        ),
+        migrations.AddField(
+            model_name='scanrun',
+            name='stage_seconds',
+            field=models.JSONField(blank=True, default=dict, help_text="Seconds per stage summed over the scanned resumes, plus 'jd' for the JD analysis"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0010_backgroundtask_heartbeat_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='backgroundtask',
+            name='kind',
+            field=models.CharField(choices=[('SCAN_RUN', 'Scan run'), ('SCORE_RESUME', 'Score resume against all jobs'), ('BULK_UPLOAD', 'Parse bulk upload'), ('SCORE_JOB', 'Score all stored resumes against a new job'), ('SYNC_INDEX', 'Sync the stored-resume search index')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0011_backgroundtask_sync_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scanresult',
+            name='source_path',
+            field=models.CharField(blank=True, max_length=1024),
+        ),
+    ]
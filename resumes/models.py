@@ -8,7 +8,9 @@ from jobs.models import JobRequirement
 
 class Resume(models.Model):
     file = models.FileField(upload_to='resumes/')
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True, help_text="SHA-256 of the uploaded file")
     parsed_content = models.TextField(blank=True)
+    parsed_with_ocr = models.BooleanField(default=False, help_text="parsed_content was recovered by OCR (image or scanned PDF)")
     uploaded_at = models.DateTimeField(auto_now_add=True)
     
     # Metadata
@@ -116,18 +118,66 @@ class SubmissionActivity(models.Model):
         ordering = ['-timestamp']
 
 
+# Screening stages timed per resume (ScanResult.timings) and summed per run (ScanRun.stage_seconds)
+SCAN_STAGES = ('extract', 'keywords', 'semantic', 'rules', 'persist')
+
+
 class ScanRun(models.Model):
     """One batch: JD + multiple resumes scanned together."""
+    STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='scan_runs')
     jd_text = models.TextField(help_text="Job description used for matching")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Background processing progress
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='QUEUED')
+    total_resumes = models.PositiveIntegerField(default=0)
+    processed_resumes = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    stage_seconds = models.JSONField(
+        default=dict, blank=True,
+        help_text="Seconds per stage summed over the scanned resumes, plus 'jd' for the JD analysis",
+    )
+
     class Meta:
         ordering = ['-created_at']
 
     def __str__(self):
         return f"ScanRun {self.id} ({self.created_at.date()})"
 
+    @property
+    def is_finished(self):
+        return self.status in ('DONE', 'FAILED')
+
+    @property
+    def progress_percent(self):
+        if not self.total_resumes:
+            return 100 if self.is_finished else 0
+        return min(100, round(self.processed_resumes * 100 / self.total_resumes))
+
+    @property
+    def stage_breakdown(self):
+        """[{stage, seconds, ms_per_resume, percent}] in pipeline order, for the results page."""
+        timings = self.stage_seconds or {}
+        total = sum(timings.get(stage, 0.0) for stage in SCAN_STAGES)
+        resumes = self.processed_resumes or 0
+        return [
+            {
+                'stage': stage,
+                'seconds': round(timings.get(stage, 0.0), 2),
+                'ms_per_resume': round(timings.get(stage, 0.0) * 1000 / resumes, 1) if resumes else None,
+                'percent': round(timings.get(stage, 0.0) * 100 / total) if total else 0,
+            }
+            for stage in SCAN_STAGES
+        ] if total else []
+
 
 class ScanResult(models.Model):
     """Per-candidate result: all AI match + quality check + report data."""
@@ -148,6 +198,9 @@ class ScanResult(models.Model):
     recommendation = models.CharField(max_length=20, blank=True)  # Hire / Hold / Reject
     qa_grade = models.CharField(max_length=5, blank=True)  # A / B / C / D
     qa_verdict = models.TextField(blank=True)
+    timings = models.JSONField(default=dict, blank=True, help_text="Seconds spent on this resume per stage")
+    # File scan_resumes read this resume from; a resumed run skips these paths without re-reading them
+    source_path = models.CharField(max_length=1024, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -156,3 +209,48 @@ class ScanResult(models.Model):
     def __str__(self):
         return f"{self.candidate_name} - {self.final_weighted_score}%"
 
+    @property
+    def total_ms(self):
+        return round(sum((self.timings or {}).values()) * 1000)
+
+    @property
+    def timing_summary(self):
+        """e.g. 'extract 120 ms · keywords 2 ms · semantic 5 ms · rules 3 ms · persist 1 ms'"""
+        timings = self.timings or {}
+        return " · ".join(f"{stage} {timings[stage] * 1000:.0f} ms" for stage in SCAN_STAGES if stage in timings)
+
+
+
+class BackgroundTask(models.Model):
+    """Database-backed job queue entry, processed by resumes.tasks (in-process thread or run_worker)."""
+    KIND_CHOICES = [
+        ('SCAN_RUN', 'Scan run'),
+        ('SCORE_RESUME', 'Score resume against all jobs'),
+        ('BULK_UPLOAD', 'Parse bulk upload'),
+        ('SCORE_JOB', 'Score all stored resumes against a new job'),
+        ('SYNC_INDEX', 'Sync the stored-resume search index'),
+    ]
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Refreshed by the consumer while the task runs; a RUNNING task without a recent heartbeat is stale
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [models.Index(fields=['status', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.kind} #{self.id} ({self.status})"
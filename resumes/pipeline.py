@@ -0,0 +1,633 @@
+"""
+Screening pipeline shared by the views and the background worker:
+QA rules (experience, certifications, compliance, risk, document quality),
+per-resume QA + ScanResult creation, and ResumeScore creation for jobs.
+Scan stages are timed per resume (ScanResult.timings) and logged as JSON
+on the 'resumes.pipeline' logger.
+"""
+import json
+import logging
+import os
+import re
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from ai_engine.embedding_cache import text_hash
+from ai_engine.matcher import KeywordMatcher
+from ai_engine.extraction_cache import extract_cached, extract_many_cached, file_hash
+from ai_engine.screener import (
+    calculate_resume_score,
+    encode_texts,
+    extract_keywords,
+    is_fallback,
+    score_resumes_against_jd,
+)
+from ai_engine import screener
+from jobs.models import JobRequirement
+from .models import SCAN_STAGES, Resume, ResumeScore, ScanResult
+from .search import forget_resumes, get_resume_index, sync_resume_index
+
+# Job fields the scoring path reads; the other JSON fields are never loaded
+JOB_SCORING_FIELDS = ('id', 'title', 'description', 'required_skills')
+
+# (key, embedding matrix) for the job descriptions, see job_embedding_matrix()
+_job_matrix = None
+
+logger = logging.getLogger(__name__)
+
+
+def resume_file_hash(resume):
+    """resume.content_hash; computed from the stored file (and saved) for resumes uploaded before hashing."""
+    if not resume.content_hash and resume.file:
+        try:
+            resume.content_hash = file_hash(resume.file.path)
+        except OSError:
+            return ""
+        Resume.objects.filter(pk=resume.pk).update(content_hash=resume.content_hash)
+    return resume.content_hash
+
+
+def ensure_parsed_content(resume):
+    """
+    Returns resume.parsed_content, re-parsing the stored file if it is empty.
+    Files the current parser already failed on are not re-parsed (see ai_engine.extraction_cache).
+    """
+    resume_text = resume.parsed_content or ""
+    if not resume_text.strip() and resume.file:
+        try:
+            result = extract_cached(resume.file.path, resume_file_hash(resume))
+            if result.text:
+                resume.parsed_content = result.text
+                resume.parsed_with_ocr = result.ocr
+                resume.save(update_fields=['parsed_content', 'parsed_with_ocr'])
+                forget_resumes([resume.pk])
+            resume_text = resume.parsed_content or ""
+        except Exception:
+            pass
+    return resume_text
+
+
+def parse_resumes(resumes, workers=None, timings=None):
+    """
+    Extracts text for every resume without parsed_content, in parallel worker
+    processes; files the current parser has already seen are answered from the
+    extraction cache. Returns {resume.pk: error} for files that failed or timed
+    out. The parsed text is written back in one bulk update. `workers` overrides
+    settings.ATS_EXTRACTION_WORKERS; `timings`, if given, receives {resume.pk: seconds}.
+    """
+    by_path = {r.file.path: r for r in resumes if r.file and not (r.parsed_content or "").strip()}
+    errors = {}
+    if not by_path:
+        return errors
+    results = extract_many_cached(
+        {path: resume_file_hash(resume) for path, resume in by_path.items()},
+        workers=workers or getattr(settings, 'ATS_EXTRACTION_WORKERS', None),
+        timeout=getattr(settings, 'ATS_EXTRACTION_TIMEOUT', None),
+    )
+    parsed = []
+    for result in results:
+        resume = by_path[result.file_path]
+        if timings is not None:
+            timings[resume.pk] = result.seconds or 0.0
+        if result.error:
+            print(f"Extraction {'timed out' if result.error == 'timeout' else 'failed'} for {resume.file.name}: {result.error}")
+            errors[resume.pk] = result.error
+        if result.text:
+            resume.parsed_content = result.text
+            resume.parsed_with_ocr = result.ocr
+            parsed.append(resume)
+    if parsed:
+        with transaction.atomic():
+            Resume.objects.bulk_update(parsed, ['parsed_content', 'parsed_with_ocr'])
+        forget_resumes([resume.pk for resume in parsed])
+    return errors
+
+
+def run_qa_and_create_scan_result(scan_run, resume, jd, semantic_score=None, reparse=True, extraction_error=None):
+    """
+    Run full QA for one resume vs JD and create ScanResult. `jd` is the JD text or a
+    JDProfile built once for the run. Uses resume.parsed_content; re-parses if empty
+    unless `reparse` is False (the batch path already tried).
+    """
+    result = build_scan_result(scan_run, resume, jd, semantic_score, reparse, extraction_error)
+    started = time.perf_counter()
+    with transaction.atomic():
+        result.save()
+        result.timings['persist'] = round(time.perf_counter() - started, 6)
+        ScanResult.objects.filter(pk=result.pk).update(timings=result.timings)
+    return result
+
+
+def build_scan_result(scan_run, resume, jd, semantic_score=None, reparse=True, extraction_error=None, timings=None):
+    """
+    Runs full QA for one resume vs JD and returns the unsaved ScanResult. Stage
+    seconds measured by the caller (batch extraction and scoring) can be passed
+    in `timings`; the rest are measured here.
+    """
+    timings = dict(timings or {})
+    profile = jd if isinstance(jd, JDProfile) else JDProfile(jd)
+    jd_text = profile.text
+    started = time.perf_counter()
+    resume_text = ensure_parsed_content(resume) if reparse else (resume.parsed_content or "")
+    timings.setdefault('extract', time.perf_counter() - started)
+    fname = resume.file.name and os.path.basename(resume.file.name) or f"Resume {resume.pk}"
+    if semantic_score is None:
+        started = time.perf_counter()
+        semantic_score = profile.score([resume_text])[0]
+        timings['semantic'] = time.perf_counter() - started
+    timings.setdefault('semantic', 0.0)
+    # One keyword pass over the resume feeds the skill check and every rule below
+    started = time.perf_counter()
+    resume_hits = profile.matcher.match(resume_text)
+    timings['keywords'] = time.perf_counter() - started
+    started = time.perf_counter()
+    base_scores = calculate_resume_score(
+        resume_text, jd_text, profile.keywords,
+        semantic_score=semantic_score, skill_hits=resume_hits['skills'],
+    )
+    experience_score, experience_notes = experience_match_for_years(profile.required_years, resume_text)
+    cert_status, cert_details = analyze_certifications(jd_text, resume_text, profile.hits, resume_hits)
+    compliance_issues = detect_compliance_issues(jd_text, resume_text, profile.hits, resume_hits)
+    risk_flags = detect_risk_flags(jd_text, resume_text, resume_hits)
+    doc_quality_score, doc_quality_label = compute_document_quality(resume_text, resume_hits)
+    if extraction_error == 'timeout':
+        doc_quality_label = "Text extraction timed out – document could not be read"
+    elif extraction_error:
+        doc_quality_label = "Text extraction failed – document could not be read"
+    final_score, recommendation = compute_final_score_and_recommendation(
+        base_scores['semantic_score'], base_scores['skill_score'], experience_score,
+        len(compliance_issues), len(risk_flags),
+    )
+    qa_grade, qa_verdict = compute_qa_grade_and_verdict(
+        final_score, doc_quality_score, cert_status,
+        len(compliance_issues), len(risk_flags), recommendation,
+    )
+    timings['rules'] = time.perf_counter() - started
+    return ScanResult(
+        scan_run=scan_run,
+        resume=resume,
+        candidate_name=resume.candidate_name or os.path.splitext(fname)[0].replace('_', ' ').title(),
+        document_quality_score=doc_quality_score,
+        document_quality_label=doc_quality_label,
+        skill_match_percentage=base_scores['skill_score'],
+        experience_match_score=experience_score,
+        experience_notes=experience_notes,
+        certification_status=cert_status,
+        certification_details=cert_details,
+        compliance_issues=compliance_issues,
+        risk_flags=risk_flags,
+        final_weighted_score=final_score,
+        recommendation=recommendation,
+        qa_grade=qa_grade,
+        qa_verdict=qa_verdict,
+        timings={stage: round(seconds, 6) for stage, seconds in timings.items()},
+    )
+
+
+def run_qa_for_resumes(scan_run, resumes, jd, semantic_scores=None, workers=None, source_paths=None):
+    """
+    Run full QA for a batch of resumes vs one JD (text or JDProfile). Missing text is
+    extracted in parallel first; semantic scores are computed in one batch unless given,
+    and the ScanResults are written with a single bulk insert. `source_paths`, one per
+    resume, are stored on the results (scan_resumes).
+    Returns the batch's seconds per stage (see add_stage_seconds).
+
+    Batch stages (semantic scoring, persist) are charged to each resume in
+    equal shares. 'persist' is the bulk insert's time; it is only known once
+    the rows exist, so it is written into their timings by a bulk update in
+    the same transaction (whose own time is not counted).
+    """
+    if not resumes:
+        return {}
+    profile = jd if isinstance(jd, JDProfile) else JDProfile(jd)
+    extract_seconds = {}
+    extraction_errors = parse_resumes(resumes, workers=workers, timings=extract_seconds)
+    resume_texts = [resume.parsed_content or "" for resume in resumes]
+    started = time.perf_counter()
+    if semantic_scores is None:
+        semantic_scores = profile.score(resume_texts)
+    # Batch stages are charged to each resume in equal shares
+    semantic_each = (time.perf_counter() - started) / len(resumes)
+    results = [
+        build_scan_result(
+            scan_run, resume, profile,
+            semantic_score=semantic_score,
+            reparse=False,
+            extraction_error=extraction_errors.get(resume.pk),
+            timings={'extract': extract_seconds.get(resume.pk, 0.0), 'semantic': semantic_each},
+        )
+        for resume, semantic_score in zip(resumes, semantic_scores)
+    ]
+    for result, source_path in zip(results, source_paths or ()):
+        result.source_path = source_path
+    # One transaction per chunk keeps SQLite lock hold time and fsyncs down
+    with transaction.atomic():
+        started = time.perf_counter()
+        ScanResult.objects.bulk_create(results)
+        persist_each = (time.perf_counter() - started) / len(resumes)
+        for result in results:
+            result.timings['persist'] = round(persist_each, 6)
+        ScanResult.objects.bulk_update(results, ['timings'])
+
+    stage_seconds = {stage: 0.0 for stage in SCAN_STAGES}
+    for result in results:
+        for stage, seconds in result.timings.items():
+            stage_seconds[stage] += seconds
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps({
+                'event': 'scan_result_timings', 'scan_run': scan_run.pk, 'resume': result.resume_id, **result.timings,
+            }))
+    return stage_seconds
+
+
+def add_stage_seconds(totals, stage_seconds):
+    """Adds one batch's seconds per stage into a run's running totals (ScanRun.stage_seconds)."""
+    for stage, seconds in stage_seconds.items():
+        totals[stage] = round(totals.get(stage, 0.0) + seconds, 6)
+    return totals
+
+
+def log_scan_run_timings(scan_run, stage_seconds):
+    logger.info(json.dumps({
+        'event': 'scan_run_timings', 'scan_run': scan_run.pk, 'resumes': scan_run.total_resumes,
+        **{stage: round(seconds, 3) for stage, seconds in stage_seconds.items()},
+    }))
+
+
+def score_resumes_for_job(resumes, job):
+    """Score parsed resumes against one job (JD encoded once) and create their ResumeScores."""
+    # Re-uploaded resumes may already be scored for this job
+    already_scored = set(ResumeScore.objects.filter(job=job).values_list('resume_id', flat=True))
+    resumes = [r for r in resumes if r.parsed_content and r.pk not in already_scored]
+    if not resumes:
+        return
+    try:
+        semantic_scores = score_resumes_against_jd(job.description, [r.parsed_content for r in resumes])
+    except Exception as e:
+        print(f"Batch scoring error: {e}")
+        semantic_scores = [None] * len(resumes)
+    resume_scores = []
+    for resume, semantic_score in zip(resumes, semantic_scores):
+        try:
+            scores = calculate_resume_score(
+                resume.parsed_content, job.description, job.required_skills,
+                semantic_score=semantic_score,
+            )
+            resume_scores.append(_build_resume_score(resume, job, scores))
+        except Exception as e:
+            print(f"Scoring error for {resume.file.name}: {e}")
+    _save_resume_scores(resume_scores)
+
+
+def job_embedding_matrix(jobs):
+    """
+    Embeddings of the jobs' descriptions as one matrix, rows in `jobs` order.
+    Cached per process and rebuilt only when a job is added, removed or edited;
+    a rebuild goes through the embedding cache, so only changed JDs are encoded.
+    """
+    global _job_matrix
+    key = (screener.encoder_key(), tuple((job.pk, text_hash(job.description or "")) for job in jobs))
+    cached = _job_matrix
+    if cached is None or cached[0] != key:
+        cached = (key, encode_texts([job.description or "" for job in jobs]))
+        _job_matrix = cached
+    return cached[1]
+
+
+def score_resume_for_jobs(resume):
+    """
+    Score one resume against every job it has no score for yet and create its
+    ResumeScores. The resume is encoded once (or chunked) and compared with the
+    cached job embedding matrix in a single matrix product.
+    """
+    resume_text = resume.parsed_content or ""
+    jobs = list(JobRequirement.objects.only(*JOB_SCORING_FIELDS).order_by('pk'))
+    # A re-uploaded resume keeps the scores it already has
+    already_scored = set(ResumeScore.objects.filter(resume=resume).values_list('job_id', flat=True))
+    rows = [i for i, job in enumerate(jobs) if job.pk not in already_scored]
+    if not rows:
+        return
+    try:
+        if is_fallback():
+            # The resume's sparse row is cached, so each job is one small sparse product
+            semantic_scores = [score_resumes_against_jd(jobs[i].description, [resume_text])[0] for i in rows]
+        else:
+            similarities = screener.resume_similarities([resume_text], job_embedding_matrix(jobs)[rows])[0]
+            semantic_scores = (similarities * 100).tolist()
+    except Exception as e:
+        print(f"Batch scoring error: {e}")
+        semantic_scores = [None] * len(rows)
+
+    resume_scores = []
+    for i, semantic_score in zip(rows, semantic_scores):
+        job = jobs[i]
+        try:
+            scores = calculate_resume_score(
+                resume_text, job.description, job.required_skills, semantic_score=semantic_score,
+            )
+            resume_scores.append(_build_resume_score(resume, job, scores))
+        except Exception as e:
+            print(f"Scoring error for job {job.id}: {e}")
+    _save_resume_scores(resume_scores)
+
+
+def score_job_for_resumes(job, chunk_size=500):
+    """
+    Score every stored resume against a new job and create the ResumeScores.
+    The JD is encoded once and compared with the whole resume vector index in
+    one matrix-vector product; resumes are then loaded in chunks for the skill
+    check and their scores bulk-inserted per chunk.
+    """
+    already_scored = set(ResumeScore.objects.filter(job=job).values_list('resume_id', flat=True))
+    resume_ids = [
+        pk for pk in Resume.objects.exclude(parsed_content='').order_by('pk').values_list('pk', flat=True)
+        if pk not in already_scored
+    ]
+    score_by_id = None
+    # The index holds whole-text embeddings; pooled chunk scores go through the batch path
+    if not is_fallback() and not screener.chunking_enabled():
+        index = get_resume_index()
+        sync_resume_index(index)
+        ids, similarities = index.similarities(encode_texts([job.description], batch_size=1)[0])
+        score_by_id = dict(zip(ids.tolist(), (similarities * 100).tolist()))
+
+    for start in range(0, len(resume_ids), chunk_size):
+        resumes = list(Resume.objects.filter(pk__in=resume_ids[start:start + chunk_size]))
+        if score_by_id is None:
+            # TF-IDF fallback: one sparse product per chunk
+            score_resumes_for_job(resumes, job)
+            continue
+        resume_scores = []
+        for resume in resumes:
+            try:
+                scores = calculate_resume_score(
+                    resume.parsed_content, job.description, job.required_skills,
+                    semantic_score=score_by_id.get(resume.pk),
+                )
+                resume_scores.append(_build_resume_score(resume, job, scores))
+            except Exception as e:
+                print(f"Scoring error for {resume.file.name}: {e}")
+        _save_resume_scores(resume_scores)
+
+
+def _save_resume_scores(resume_scores):
+    if not resume_scores:
+        return
+    # A concurrent run may have scored the same (resume, job) pair: keep the first
+    with transaction.atomic():
+        ResumeScore.objects.bulk_create(resume_scores, ignore_conflicts=True)
+
+
+def _build_resume_score(resume, job, scores):
+    return ResumeScore(
+        resume=resume,
+        job=job,
+        match_percentage=scores['final_score'],
+        skill_match_score=scores['skill_score'],
+        semantic_score=scores['semantic_score'],
+        missing_skills=scores['missing_skills'],
+        matched_skills=scores['matched_skills'],
+        classification=scores['classification'],
+        ai_explanation=scores.get('ai_explanation', '')
+    )
+
+
+def extract_years_of_experience(text):
+    """
+    Very simple regex-based extraction of years of experience from text.
+    Looks for patterns like '5 years', '3+ yrs', etc.
+    """
+    if not text:
+        return None
+    matches = re.findall(r'(\d+)\s*\+?\s*(?:years?|yrs?)', text.lower())
+    if not matches:
+        return None
+    try:
+        return max(int(m) for m in matches)
+    except ValueError:
+        return None
+
+
+def compute_experience_match(jd_text, resume_text):
+    return experience_match_for_years(extract_years_of_experience(jd_text), resume_text)
+
+
+def experience_match_for_years(jd_years, resume_text):
+    resume_years = extract_years_of_experience(resume_text)
+
+    if jd_years is None or resume_years is None:
+        return 50.0, "Insufficient explicit experience data in JD or resume."
+
+    ratio = resume_years / jd_years if jd_years > 0 else 1
+    score = max(0.0, min(100.0, ratio * 100))
+    notes = f"JD requires approximately {jd_years}+ years; resume indicates about {resume_years} years."
+    return round(score, 2), notes
+
+
+KNOWN_CERT_KEYWORDS = [
+    "aws certified",
+    "azure",
+    "gcp",
+    "pmp",
+    "cissp",
+    "cisa",
+    "cism",
+    "scrum master",
+    "csm",
+    "salesforce",
+]
+
+
+def analyze_certifications(jd_text, resume_text, jd_hits=None, resume_hits=None):
+    jd_found = (jd_hits or match_qa_keywords(jd_text))['certifications']
+    resume_found = (resume_hits or match_qa_keywords(resume_text))['certifications']
+
+    jd_certs = [c for c in KNOWN_CERT_KEYWORDS if c in jd_found]
+    resume_certs = [c for c in KNOWN_CERT_KEYWORDS if c in resume_found]
+
+    if not jd_certs:
+        return "Not Specified", "Job description does not specify mandatory certifications."
+
+    missing = [c for c in jd_certs if c not in resume_certs]
+    if not missing:
+        return "All Mandatory Certifications Present", "All key certifications mentioned in JD are present in the resume."
+
+    details = f"Missing certifications: {', '.join(missing)}."
+    return "Missing Mandatory Certifications", details
+
+
+COMPLIANCE_KEYWORDS = [
+    "background check",
+    "drug test",
+    "security clearance",
+    "work authorization",
+    "work permit",
+]
+
+
+def detect_compliance_issues(jd_text, resume_text, jd_hits=None, resume_hits=None):
+    jd_found = (jd_hits or match_qa_keywords(jd_text))['compliance']
+    resume_found = (resume_hits or match_qa_keywords(resume_text))['compliance']
+    issues = []
+
+    for kw in COMPLIANCE_KEYWORDS:
+        if kw in jd_found and kw not in resume_found:
+            issues.append(f"JD mentions '{kw}' but the resume does not explicitly address it.")
+
+    return issues
+
+
+RISK_KEYWORDS = [
+    "terminated",
+    "fired",
+    "layoff",
+    "disciplinary",
+    "probation",
+    "criminal",
+    "conviction",
+    "warning letter",
+]
+
+
+def detect_risk_flags(jd_text, resume_text, resume_hits=None):
+    # JD not strictly needed here but kept for signature flexibility
+    resume_found = (resume_hits or match_qa_keywords(resume_text))['risk']
+    flags = []
+
+    for kw in RISK_KEYWORDS:
+        if kw in resume_found:
+            flags.append(f"Resume contains potential risk term: '{kw}'.")
+
+    return flags
+
+
+def compute_final_score_and_recommendation(
+    semantic_score,
+    skill_score,
+    experience_score,
+    compliance_issue_count,
+    risk_flag_count,
+):
+    base_score = (0.4 * semantic_score) + (0.35 * skill_score) + (0.25 * experience_score)
+    penalty = (compliance_issue_count * 5) + (risk_flag_count * 7)
+    final = max(0.0, min(100.0, base_score - penalty))
+
+    if final >= 80 and compliance_issue_count == 0 and risk_flag_count == 0:
+        recommendation = "Hire"
+    elif final >= 55:
+        recommendation = "Hold"
+    else:
+        recommendation = "Reject"
+
+    return round(final, 2), recommendation
+
+
+DOCUMENT_QUALITY_KEYWORDS = [
+    "experience", "education", "skills", "summary", "objective",
+    "work", "employment", "certification", "project", "contact", "email",
+]
+
+
+# All QA keyword lists in one matcher, so each text is scanned once.
+# Section headings may be inflected freely ("Projects", "Experienced");
+# risk terms allow common inflections ("layoffs").
+QA_KEYWORD_SETS = {
+    'certifications': KNOWN_CERT_KEYWORDS,
+    'compliance': COMPLIANCE_KEYWORDS,
+    'risk': RISK_KEYWORDS,
+    'quality': DOCUMENT_QUALITY_KEYWORDS,
+}
+QA_MATCH_MODES = {'risk': 'inflected', 'quality': 'prefix'}
+QA_MATCHER = KeywordMatcher(QA_KEYWORD_SETS, modes=QA_MATCH_MODES)
+
+
+def match_qa_keywords(text):
+    """Returns {category: set of QA keywords found in text} from a single scan."""
+    return QA_MATCHER.match(text or "")
+
+
+class JDProfile:
+    """
+    Everything the QA rules derive from a job description, computed once per
+    scan run instead of once per resume: spaCy keywords, required years, the
+    JD's QA keyword hits, a matcher covering the QA lists plus the JD keywords
+    (one pass per resume), and the JD embedding (encoded on first use).
+    """
+
+    def __init__(self, jd_text):
+        self.text = jd_text or ""
+        self.keywords = extract_keywords(self.text) or []
+        self.required_years = extract_years_of_experience(self.text)
+        self.hits = match_qa_keywords(self.text)
+        self.matcher = KeywordMatcher(
+            dict(QA_KEYWORD_SETS, skills=self.keywords),
+            modes=dict(QA_MATCH_MODES, skills='inflected'),
+        )
+        self._embedding = None
+
+    @property
+    def embedding(self):
+        """The normalised JD embedding, or None under the TF-IDF fallback."""
+        if self._embedding is None and not is_fallback():
+            self._embedding = encode_texts([self.text], batch_size=1)[0]
+        return self._embedding
+
+    def score(self, resume_texts):
+        """Semantic scores (0-100) of resume texts against this JD."""
+        return score_resumes_against_jd(self.text, resume_texts, jd_embedding=self.embedding)
+
+
+def compute_document_quality(resume_text, resume_hits=None):
+    """
+    Simple QA: completeness of resume (length + presence of common sections).
+    Returns (score 0-100, label).
+    """
+    if not resume_text or len(resume_text.strip()) < 50:
+        return 0.0, "Incomplete or unreadable document"
+    word_count = len(resume_text.split())
+    section_hits = len((resume_hits or match_qa_keywords(resume_text))['quality'])
+    # Score: base on word count (cap at 500) + section coverage
+    length_score = min(100.0, (word_count / 5.0))  # 500 words = 100
+    section_score = min(100.0, (section_hits / len(DOCUMENT_QUALITY_KEYWORDS)) * 100)
+    score = (0.5 * length_score) + (0.5 * section_score)
+    score = round(min(100.0, score), 2)
+    if score >= 80:
+        label = "High quality – complete and well-structured"
+    elif score >= 55:
+        label = "Good – main sections present"
+    elif score >= 30:
+        label = "Fair – some sections missing or brief"
+    else:
+        label = "Needs improvement – sparse or unclear content"
+    return score, label
+
+
+def compute_qa_grade_and_verdict(
+    final_score,
+    doc_quality_score,
+    cert_status,
+    compliance_count,
+    risk_count,
+    recommendation,
+):
+    """
+    Best QA style: letter grade (A/B/C/D) and short verdict.
+    """
+    cert_ok = "missing" not in cert_status.lower() and "not specified" not in cert_status.lower()
+    cert_ok = cert_ok or "all mandatory" in cert_status.lower()
+
+    if final_score >= 80 and doc_quality_score >= 60 and compliance_count == 0 and risk_count == 0:
+        grade = "A"
+        verdict = "Best QA – Strong match, document and checks passed. Ready for next stage."
+    elif final_score >= 65 and compliance_count == 0 and risk_count == 0:
+        grade = "B"
+        verdict = "Good QA – Meets requirements. Minor gaps (e.g. certs) can be clarified."
+    elif final_score >= 50 or (compliance_count == 0 and risk_count == 0):
+        grade = "C"
+        verdict = "Hold – Some criteria met. Review experience, certs or compliance before deciding."
+    else:
+        grade = "D"
+        verdict = "Does not meet QA – Significant gaps, compliance or risk issues. Not recommended."
+    return grade, verdict
@@ -0,0 +1,111 @@
+"""
+Top-K semantic search over the stored resume pool.
+
+The vector index (ai_engine.vector_index) holds one embedding per stored
+resume with parsed text. It is synced by a SYNC_INDEX background task
+(queued after uploads, and by a search that finds the index behind) or by
+`python manage.py rebuild_resume_index`: resumes added since the last sync
+are encoded (through the embedding cache) and deleted ones are dropped.
+Searches never encode the pool themselves; they rank whatever is indexed.
+Code that rewrites a resume's parsed_content calls forget_resumes() so the
+old vector is dropped and re-encoded by the next sync.
+"""
+from django.conf import settings
+
+from ai_engine import screener
+from ai_engine.vector_index import VectorIndex, stored_model_name
+from .models import Resume
+
+_index = None
+
+
+def _open_index(key):
+    return VectorIndex(
+        settings.ATS_VECTOR_INDEX_DIR,
+        key,
+        ivf_min_size=settings.ATS_VECTOR_INDEX_IVF_MIN_SIZE,
+        nprobe=settings.ATS_VECTOR_INDEX_NPROBE,
+    )
+
+
+def get_resume_index():
+    global _index
+    # Keyed by model and backend: quantized vectors never mix with fp32 ones
+    key = screener.encoder_key()
+    if _index is None or _index.model_name != key:
+        _index = _open_index(key)
+    return _index
+
+
+def forget_resumes(resume_ids):
+    """
+    Drops the vectors of resumes whose parsed_content changed; the next sync
+    re-encodes them. Works on the on-disk index whichever encoder built it,
+    without loading one.
+    """
+    key = stored_model_name(settings.ATS_VECTOR_INDEX_DIR) if resume_ids else None
+    if key:
+        _open_index(key).remove(resume_ids)
+
+
+def pending_changes(index):
+    """(ids to remove, ids to encode) that would bring the index in line with the stored resumes."""
+    stored_ids = set(Resume.objects.exclude(parsed_content='').values_list('pk', flat=True))
+    index.load()
+    indexed_ids = set(index.ids.tolist())
+    return indexed_ids - stored_ids, sorted(stored_ids - indexed_ids)
+
+
+def sync_resume_index(index=None, rebuild=False):
+    """Brings the index in line with the stored resumes. Returns the number of newly encoded resumes."""
+    index = index or get_resume_index()
+    if rebuild:
+        removed = set()
+        new_ids = sorted(Resume.objects.exclude(parsed_content='').values_list('pk', flat=True))
+    else:
+        removed, new_ids = pending_changes(index)
+    if removed:
+        index.remove(removed)
+
+    ids, texts = [], []
+    for start in range(0, len(new_ids), 500):
+        rows = Resume.objects.filter(pk__in=new_ids[start:start + 500]).values_list('pk', 'parsed_content')
+        for pk, text in rows:
+            ids.append(pk)
+            texts.append(text)
+    vectors = screener.encode_texts(texts) if texts else None
+    if rebuild:
+        index.rebuild(ids, vectors if vectors is not None else [])
+    elif ids:
+        index.add(ids, vectors)
+    return len(ids)
+
+
+def search_stored_resumes(jd_text, top_k):
+    """
+    Returns up to top_k (resume, semantic_score 0-100) pairs from the whole
+    stored pool, best first. Resumes not indexed yet are left out; a
+    background sync is queued for them.
+    """
+    if screener.is_fallback():
+        # No embeddings without the sentence encoder: score the pool with one sparse TF-IDF product
+        resumes = list(Resume.objects.exclude(parsed_content=''))
+        scores = screener.score_resumes_against_jd(jd_text, [r.parsed_content for r in resumes])
+        ranked = sorted(zip(resumes, scores), key=lambda pair: pair[1], reverse=True)
+        return ranked[:top_k]
+
+    from .tasks import enqueue_index_sync
+
+    index = get_resume_index()
+    removed, new_ids = pending_changes(index)
+    if removed or new_ids:
+        enqueue_index_sync()
+    jd_embedding = screener.encode_texts([jd_text], batch_size=1)[0]
+    hits = index.search(jd_embedding, top_k)
+    resumes = Resume.objects.in_bulk([pk for pk, _ in hits])
+    ranked = [(resumes[pk], similarity * 100) for pk, similarity in hits if pk in resumes]
+    if screener.chunking_enabled() and ranked:
+        # The index shortlists on whole-text embeddings; re-rank the shortlist on pooled chunk scores
+        scores = screener.score_resumes_against_jd(jd_text, [r.parsed_content for r, _ in ranked], jd_embedding=jd_embedding)
+        ranked = sorted(zip([r for r, _ in ranked], scores), key=lambda pair: pair[1], reverse=True)
+    return ranked
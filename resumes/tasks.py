@@ -0,0 +1,256 @@
+"""
+Database-backed background job queue.
+
+Views enqueue a BackgroundTask and return immediately. Tasks are claimed with
+a conditional UPDATE (PENDING -> RUNNING), so any number of consumers can
+share the queue without an external broker. A running task refreshes its
+heartbeat_at as it makes progress; one whose heartbeat is older than
+ATS_TASK_STALE_SECONDS is assumed orphaned by a crashed consumer and requeued.
+How tasks get consumed depends on settings.ATS_TASK_RUNNER:
+
+- 'thread' (default): a daemon thread in the web process drains the queue.
+- 'worker': tasks wait for `python manage.py run_worker`.
+- 'sync': tasks run inline inside the request (old behaviour, handy for debugging).
+"""
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ai_engine.screener import is_fallback
+from jobs.models import JobRequirement
+from .models import BackgroundTask, Resume, ScanRun
+from .pipeline import (
+    JOB_SCORING_FIELDS,
+    JDProfile,
+    add_stage_seconds,
+    ensure_parsed_content,
+    log_scan_run_timings,
+    parse_resumes,
+    run_qa_for_resumes,
+    score_job_for_resumes,
+    score_resume_for_jobs,
+    score_resumes_for_job,
+)
+from .search import sync_resume_index
+
+_runner_lock = threading.Lock()
+_runner_thread = None
+_runner_wakeup = threading.Event()
+
+
+class TaskLost(Exception):
+    """The task was requeued and claimed by another consumer while this one was still running it."""
+
+
+def enqueue(kind, **payload):
+    task = BackgroundTask.objects.create(kind=kind, payload=payload)
+    runner = getattr(settings, 'ATS_TASK_RUNNER', 'thread')
+    if runner == 'sync':
+        if claim_task(task.pk):
+            run_task(BackgroundTask.objects.get(pk=task.pk))
+    elif runner == 'thread':
+        ensure_runner()
+    return task
+
+
+def enqueue_scan_run(scan_run, resumes, semantic_scores=None):
+    scan_run.total_resumes = len(resumes)
+    scan_run.save(update_fields=['total_resumes'])
+    return enqueue(
+        'SCAN_RUN',
+        scan_run_id=scan_run.pk,
+        resume_ids=[r.pk for r in resumes],
+        semantic_scores=semantic_scores,
+    )
+
+
+def enqueue_index_sync():
+    """Queues a stored-resume index sync unless one is already waiting (it will see every change)."""
+    if BackgroundTask.objects.filter(kind='SYNC_INDEX', status='PENDING').exists():
+        return None
+    return enqueue('SYNC_INDEX')
+
+
+def ensure_runner():
+    """Starts the in-process queue consumer thread if it is not already running."""
+    global _runner_thread
+    if getattr(settings, 'ATS_TASK_RUNNER', 'thread') != 'thread':
+        return
+    with _runner_lock:
+        _runner_wakeup.set()
+        if _runner_thread is None or not _runner_thread.is_alive():
+            _runner_thread = threading.Thread(target=_drain_in_thread, name='ats-task-runner', daemon=True)
+            _runner_thread.start()
+
+
+def _drain_in_thread():
+    global _runner_thread
+    try:
+        while True:
+            # Exit only when nothing was enqueued since the last drain started
+            with _runner_lock:
+                if not _runner_wakeup.is_set():
+                    _runner_thread = None
+                    return
+                _runner_wakeup.clear()
+            drain()
+    finally:
+        connection.close()
+
+
+def drain(max_tasks=None):
+    """Processes pending tasks until the queue is empty. Returns the number processed."""
+    requeue_stale_tasks()
+    processed = 0
+    while max_tasks is None or processed < max_tasks:
+        task = claim_next_task()
+        if task is None:
+            break
+        run_task(task)
+        processed += 1
+    return processed
+
+
+def claim_next_task():
+    for pk in BackgroundTask.objects.filter(status='PENDING').values_list('pk', flat=True)[:10]:
+        if claim_task(pk):
+            return BackgroundTask.objects.get(pk=pk)
+    return None
+
+
+def claim_task(pk):
+    """Atomically moves one task from PENDING to RUNNING. False if another consumer got it first."""
+    now = timezone.now()
+    return BackgroundTask.objects.filter(pk=pk, status='PENDING').update(
+        status='RUNNING', started_at=now, heartbeat_at=now, attempts=F('attempts') + 1,
+    ) == 1
+
+
+def heartbeat(task):
+    """
+    Marks the task as still alive. Raises TaskLost if it went stale in the meantime
+    and another consumer has claimed it (or it was failed): this consumer must stop.
+    """
+    alive = BackgroundTask.objects.filter(pk=task.pk, status='RUNNING', attempts=task.attempts).update(
+        heartbeat_at=timezone.now(),
+    )
+    if not alive:
+        raise TaskLost(f"{task} was taken over by another consumer")
+
+
+def requeue_stale_tasks():
+    """Puts tasks orphaned by a crashed consumer back in the queue (or fails them after max attempts)."""
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'ATS_TASK_STALE_SECONDS', 1800))
+    stale = BackgroundTask.objects.filter(status='RUNNING').filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+    max_attempts = getattr(settings, 'ATS_TASK_MAX_ATTEMPTS', 3)
+    stale.filter(attempts__gte=max_attempts).update(
+        status='FAILED', error='Abandoned by a crashed worker too many times.', finished_at=timezone.now(),
+    )
+    stale.filter(attempts__lt=max_attempts).update(status='PENDING')
+
+
+def run_task(task):
+    close_old_connections()
+    try:
+        TASK_HANDLERS[task.kind](task)
+    except TaskLost as e:
+        # The consumer that claimed it now owns the task and its status
+        print(f"Background task stopped: {e}")
+        return
+    except Exception as e:
+        print(f"Background task {task} failed: {e}")
+        task.status = 'FAILED'
+        task.error = traceback.format_exc()
+        if task.kind == 'SCAN_RUN':
+            ScanRun.objects.filter(pk=task.payload.get('scan_run_id')).update(
+                status='FAILED', error=str(e), finished_at=timezone.now(),
+            )
+    else:
+        task.status = 'DONE'
+    task.finished_at = timezone.now()
+    task.save(update_fields=['status', 'error', 'finished_at'])
+
+
+def _process_scan_run(task):
+    payload = task.payload
+    scan_run = ScanRun.objects.get(pk=payload['scan_run_id'])
+    resume_ids = payload['resume_ids']
+    semantic_scores = payload.get('semantic_scores')
+    score_by_id = dict(zip(resume_ids, semantic_scores)) if semantic_scores is not None else None
+    # A retried run keeps the chunks already written and continues after them
+    done_ids = set(scan_run.results.values_list('resume_id', flat=True))
+    scan_run.status = 'RUNNING'
+    scan_run.total_resumes = len(resume_ids)
+    scan_run.processed_resumes = len(done_ids)
+    if not done_ids:
+        scan_run.stage_seconds = {}
+    scan_run.save(update_fields=['status', 'total_resumes', 'processed_resumes', 'stage_seconds'])
+
+    resumes = Resume.objects.in_bulk(resume_ids)
+    # JD keywords, years, QA hits and embedding are computed once for the whole run
+    started = time.perf_counter()
+    jd_profile = JDProfile(scan_run.jd_text)
+    stage_seconds = add_stage_seconds(dict(scan_run.stage_seconds), {'jd': time.perf_counter() - started})
+    chunk_size = getattr(settings, 'ATS_SCAN_CHUNK_SIZE', 16)
+    for start in range(0, len(resume_ids), chunk_size):
+        heartbeat(task)
+        chunk_ids = [pk for pk in resume_ids[start:start + chunk_size] if pk in resumes and pk not in done_ids]
+        chunk_scores = [score_by_id[pk] for pk in chunk_ids] if score_by_id is not None else None
+        if chunk_ids:
+            add_stage_seconds(stage_seconds, run_qa_for_resumes(
+                scan_run, [resumes[pk] for pk in chunk_ids], jd_profile, semantic_scores=chunk_scores,
+            ))
+        ScanRun.objects.filter(pk=scan_run.pk).update(
+            processed_resumes=min(start + chunk_size, len(resume_ids)),
+            stage_seconds=stage_seconds,
+        )
+
+    ScanRun.objects.filter(pk=scan_run.pk).update(status='DONE', finished_at=timezone.now())
+    log_scan_run_timings(scan_run, stage_seconds)
+
+
+def _process_score_resume(task):
+    resume = Resume.objects.get(pk=task.payload['resume_id'])
+    ensure_parsed_content(resume)
+    score_resume_for_jobs(resume)
+    enqueue_index_sync()
+
+
+def _process_score_job(task):
+    job = JobRequirement.objects.filter(pk=task.payload['job_id']).only(*JOB_SCORING_FIELDS).first()
+    if job:
+        score_job_for_resumes(job)
+
+
+def _process_bulk_upload(task):
+    payload = task.payload
+    resumes = list(Resume.objects.filter(pk__in=payload['resume_ids']))
+    parse_resumes(resumes)
+    job_id = payload.get('job_id')
+    if job_id:
+        job = JobRequirement.objects.filter(pk=job_id).only(*JOB_SCORING_FIELDS).first()
+        if job:
+            score_resumes_for_job(resumes, job)
+    enqueue_index_sync()
+
+
+def _process_sync_index(task):
+    if not is_fallback():
+        sync_resume_index()
+
+
+TASK_HANDLERS = {
+    'SCAN_RUN': _process_scan_run,
+    'SCORE_RESUME': _process_score_resume,
+    'BULK_UPLOAD': _process_bulk_upload,
+    'SCORE_JOB': _process_score_job,
+    'SYNC_INDEX': _process_sync_index,
+}
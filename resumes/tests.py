@@ -1,3 +1,179 @@
-from django.test import TestCase
+import io
+import tempfile
+import zipfile
+from datetime import timedelta
 
-# Create your tests here.
+import docx
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import tasks
+from .models import BackgroundTask, ScanRun
+from .uploads import ArchiveError, iter_resume_uploads, iter_zip_members
+
+
+def docx_upload(name, text):
+    document = docx.Document()
+    document.add_paragraph(text)
+    data = io.BytesIO()
+    document.save(data)
+    return SimpleUploadedFile(name, data.getvalue())
+
+
+def zip_upload(members, name='resumes.zip', compression=zipfile.ZIP_DEFLATED):
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, 'w', compression) as zf:
+        for member_name, content in members.items():
+            zf.writestr(member_name, content)
+    return SimpleUploadedFile(name, data.getvalue())
+
+
+@override_settings(ATS_TASK_STALE_SECONDS=60, ATS_TASK_MAX_ATTEMPTS=3)
+class TaskQueueTests(TestCase):
+    def running_task(self, age, attempts=1, heartbeat=True):
+        started = timezone.now() - timedelta(seconds=age)
+        return BackgroundTask.objects.create(
+            kind='SCORE_RESUME', status='RUNNING', attempts=attempts,
+            started_at=started, heartbeat_at=started if heartbeat else None,
+        )
+
+    def test_claim_task_claims_once(self):
+        task = BackgroundTask.objects.create(kind='SCORE_RESUME', payload={'resume_id': 1})
+
+        self.assertTrue(tasks.claim_task(task.pk))
+        self.assertFalse(tasks.claim_task(task.pk))
+        task.refresh_from_db()
+        self.assertEqual(task.status, 'RUNNING')
+        self.assertEqual(task.attempts, 1)
+        self.assertIsNotNone(task.started_at)
+        self.assertEqual(task.heartbeat_at, task.started_at)
+
+    def test_requeue_stale_tasks(self):
+        fresh = self.running_task(age=10)
+        stale = self.running_task(age=120)
+        stale_without_heartbeat = self.running_task(age=120, heartbeat=False)
+        exhausted = self.running_task(age=120, attempts=3)
+
+        tasks.requeue_stale_tasks()
+
+        statuses = {
+            task.pk: task.status
+            for task in BackgroundTask.objects.filter(pk__in=[fresh.pk, stale.pk, stale_without_heartbeat.pk, exhausted.pk])
+        }
+        self.assertEqual(statuses[fresh.pk], 'RUNNING')
+        self.assertEqual(statuses[stale.pk], 'PENDING')
+        self.assertEqual(statuses[stale_without_heartbeat.pk], 'PENDING')
+        self.assertEqual(statuses[exhausted.pk], 'FAILED')
+
+    def test_recent_heartbeat_keeps_long_task_running(self):
+        task = self.running_task(age=120)
+        tasks.heartbeat(task)
+
+        tasks.requeue_stale_tasks()
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, 'RUNNING')
+
+    def test_heartbeat_after_takeover_raises(self):
+        task = self.running_task(age=120)
+        tasks.requeue_stale_tasks()
+        self.assertTrue(tasks.claim_task(task.pk))
+
+        with self.assertRaises(tasks.TaskLost):
+            tasks.heartbeat(task)
+
+
+class AIFilterSyncRunnerTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        index = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.addCleanup(index.cleanup)
+        settings_override = override_settings(
+            ATS_TASK_RUNNER='sync', MEDIA_ROOT=media.name, ATS_VECTOR_INDEX_DIR=index.name,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user('recruiter', password='unused-password')
+        self.client.force_login(self.user)
+
+    def test_upload_finishes_scan_run(self):
+        jd = "Backend engineer with 5 years of Python and Django. AWS Certified preferred."
+        files = [
+            docx_upload('python_dev.docx', "Python Django developer with 6 years experience. AWS Certified. Skills, education."),
+            docx_upload('chef.docx', "Chef with 2 years experience in kitchens. Skills: cooking."),
+        ]
+
+        response = self.client.post(reverse('ai_filter'), {'job_description': jd, 'resume_files': files})
+
+        scan_run = ScanRun.objects.get(created_by=self.user)
+        self.assertRedirects(response, reverse('filter_results', args=[scan_run.pk]))
+        self.assertEqual(scan_run.status, 'DONE')
+        self.assertEqual(scan_run.total_resumes, 2)
+        self.assertEqual(scan_run.processed_resumes, 2)
+        self.assertIsNotNone(scan_run.finished_at)
+        results = list(scan_run.results.all())
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0].candidate_name, 'Python Dev')
+        self.assertGreater(results[0].final_weighted_score, results[1].final_weighted_score)
+        task = BackgroundTask.objects.get(kind='SCAN_RUN')
+        self.assertEqual(task.status, 'DONE')
+
+
+class ZipArchiveTests(TestCase):
+    def read_members(self, archive):
+        return {f.name: f.read() for f in iter_zip_members(archive)}
+
+    def test_streams_supported_members(self):
+        archive = zip_upload({
+            'a/jane_doe.pdf': b'%PDF jane',
+            'b/john.docx': b'docx john',
+            'notes.txt': b'not a resume',
+            '__MACOSX/a/._jane_doe.pdf': b'resource fork',
+            'a/.hidden.pdf': b'hidden',
+        })
+
+        self.assertEqual(self.read_members(archive), {'jane_doe.pdf': b'%PDF jane', 'john.docx': b'docx john'})
+
+    @override_settings(ATS_ZIP_MAX_MEMBERS=2)
+    def test_member_count_limit(self):
+        archive = zip_upload({f'r{i}.pdf': b'x' for i in range(3)})
+
+        with self.assertRaisesMessage(ArchiveError, 'the limit is 2'):
+            self.read_members(archive)
+
+    @override_settings(ATS_ZIP_MAX_TOTAL_BYTES=1000)
+    def test_total_size_limit(self):
+        archive = zip_upload({'a.pdf': b'a' * 600, 'b.pdf': b'b' * 600})
+
+        with self.assertRaisesMessage(ArchiveError, 'too large once uncompressed'):
+            self.read_members(archive)
+
+    @override_settings(ATS_ZIP_MAX_MEMBER_BYTES=1000)
+    def test_member_size_limit(self):
+        # Highly compressible, like a zip bomb: the limit applies to decompressed bytes
+        archive = zip_upload({'small.pdf': b'ok', 'bomb.pdf': b'\0' * 200000})
+
+        with self.assertRaisesMessage(ArchiveError, 'bomb.pdf in resumes.zip is too large'):
+            self.read_members(archive)
+
+    def test_corrupt_member_is_skipped(self):
+        archive = zip_upload({'good.pdf': b'good resume', 'bad.pdf': b'bad resume'}, compression=zipfile.ZIP_STORED)
+        data = archive.read().replace(b'bad resume', b'BAD resume')
+
+        members = self.read_members(SimpleUploadedFile('resumes.zip', data))
+
+        self.assertEqual(members, {'good.pdf': b'good resume'})
+
+    def test_unreadable_archive_is_reported(self):
+        errors = []
+        uploads = [SimpleUploadedFile('broken.zip', b'not a zip'), SimpleUploadedFile('cv.pdf', b'%PDF')]
+
+        names = [f.name for f in iter_resume_uploads(uploads, errors)]
+
+        self.assertEqual(names, ['cv.pdf'])
+        self.assertEqual(len(errors), 1)
+        self.assertIn('broken.zip is not a readable ZIP archive', errors[0])
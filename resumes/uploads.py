@@ -0,0 +1,133 @@
+"""
+Storing uploaded resume files.
+
+Uploads are content-addressed: the SHA-256 of the file is stored on Resume,
+and re-uploading a file we already have returns the existing row (with its
+parsed text and cached embedding) instead of storing and parsing a copy.
+
+ZIP archives are streamed member by member (never extracted as a whole),
+with limits on member count and uncompressed size to defuse zip bombs.
+"""
+import hashlib
+import os
+import tempfile
+import zipfile
+
+from django.conf import settings
+from django.core.files import File
+
+from .models import Resume
+
+ALLOWED_RESUME_EXTENSIONS = ('.pdf', '.docx', '.png', '.jpg', '.jpeg')
+
+
+class ArchiveError(Exception):
+    """The uploaded ZIP archive is unreadable or exceeds the configured limits."""
+
+
+def is_allowed_resume_file(name):
+    return name.lower().endswith(ALLOWED_RESUME_EXTENSIONS)
+
+
+def candidate_name_from_filename(name):
+    return os.path.splitext(os.path.basename(name))[0].replace('_', ' ').title()
+
+
+def file_sha256(uploaded_file):
+    digest = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+    uploaded_file.seek(0)
+    return digest.hexdigest()
+
+
+def store_uploaded_resume(uploaded_file):
+    """
+    Returns (resume, created). An identical file uploaded before is reused as-is;
+    otherwise a new Resume is saved with the file and its content hash.
+    """
+    content_hash = file_sha256(uploaded_file)
+    existing = Resume.objects.filter(content_hash=content_hash).order_by('pk').first()
+    if existing is not None:
+        return existing, False
+
+    resume = Resume(content_hash=content_hash)
+    resume.file = uploaded_file
+    # Extract simple name from path if directory upload sends paths
+    resume.candidate_name = candidate_name_from_filename(uploaded_file.name)
+    resume.save()
+    return resume, True
+
+
+def is_zip_archive(name):
+    return name.lower().endswith('.zip')
+
+
+def iter_resume_uploads(files, errors=None):
+    """
+    Yields uploaded resume files with supported extensions, expanding ZIP archives
+    member by member. An archive that is unreadable or breaks the limits is
+    skipped with its message appended to `errors` (raises ArchiveError if None).
+    """
+    for f in files:
+        if is_zip_archive(f.name):
+            try:
+                yield from iter_zip_members(f)
+            except ArchiveError as e:
+                if errors is None:
+                    raise
+                errors.append(str(e))
+        elif is_allowed_resume_file(f.name):
+            yield f
+
+
+def iter_zip_members(archive):
+    """
+    Streams the supported resume files out of a ZIP archive, one at a time.
+    Each member is decompressed into a spooled temp file (in memory up to 1 MB,
+    then on disk), so memory stays bounded whatever the archive size. Limits are
+    enforced on the bytes actually decompressed, not on the (forgeable) header sizes.
+    """
+    max_members = getattr(settings, 'ATS_ZIP_MAX_MEMBERS', 2000)
+    max_total_bytes = getattr(settings, 'ATS_ZIP_MAX_TOTAL_BYTES', 500 * 1024 * 1024)
+    max_member_bytes = getattr(settings, 'ATS_ZIP_MAX_MEMBER_BYTES', 20 * 1024 * 1024)
+
+    try:
+        zf = zipfile.ZipFile(archive)
+    except (zipfile.BadZipFile, OSError) as e:
+        raise ArchiveError(f"{archive.name} is not a readable ZIP archive ({e}).")
+
+    with zf:
+        members = [
+            info for info in zf.infolist()
+            if not info.is_dir()
+            and is_allowed_resume_file(info.filename)
+            and not info.filename.startswith('__MACOSX/')
+            and not os.path.basename(info.filename).startswith('.')
+        ]
+        if len(members) > max_members:
+            raise ArchiveError(f"{archive.name} contains {len(members)} resumes; the limit is {max_members}.")
+        if sum(info.file_size for info in members) > max_total_bytes:
+            raise ArchiveError(f"{archive.name} is too large once uncompressed.")
+
+        total_bytes = 0
+        for info in members:
+            spool = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+            try:
+                member_bytes = 0
+                with zf.open(info) as src:
+                    for chunk in iter(lambda: src.read(64 * 1024), b''):
+                        member_bytes += len(chunk)
+                        total_bytes += len(chunk)
+                        if member_bytes > max_member_bytes:
+                            raise ArchiveError(f"{info.filename} in {archive.name} is too large once uncompressed.")
+                        if total_bytes > max_total_bytes:
+                            raise ArchiveError(f"{archive.name} is too large once uncompressed.")
+                        spool.write(chunk)
+                spool.seek(0)
+                yield File(spool, name=os.path.basename(info.filename))
+            except (zipfile.BadZipFile, zipfile.LargeZipFile, RuntimeError, OSError) as e:
+                # Corrupt or encrypted member: skip it, keep the rest of the archive
+                print(f"Skipping {info.filename} in {archive.name}: {e}")
+            finally:
+                spool.close()